@@ -0,0 +1,108 @@
+"""
+Measure how long logging calls block the calling thread with a plain
+FileHandler versus the queued handler from src.core.log.
+
+Many threads log concurrently, as request threads do under load; each call is
+timed from the caller's side. Use --io-delay-ms to simulate a slow disk:
+
+    python benchmarks/logging_latency.py --threads 32 --records 2000 \\
+        --io-delay-ms 0.2
+
+Results are printed as JSON, one entry per handler.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.log import QueuedHandler  # noqa: E402
+
+FORMAT = "{levelname} {asctime} {name} {module} {funcName} line:{lineno} {message}"
+
+
+class SlowFileHandler(logging.FileHandler):
+    delay = 0.0
+
+    def emit(self, record):
+        super().emit(record)
+        self.flush()
+        if self.delay:
+            time.sleep(self.delay)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run(name, handler, threads, records):
+    handler.setFormatter(logging.Formatter(FORMAT, style="{"))
+    logger = logging.getLogger(f"benchmarks.logging.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+    def work(_):
+        latencies = []
+        for i in range(records):
+            started = time.perf_counter()
+            logger.info("Retrieved %s ID=%s", "Article", i)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = [t for batch in pool.map(work, range(threads)) for t in batch]
+    elapsed = time.perf_counter() - started
+    handler.close()
+    logger.removeHandler(handler)
+
+    return {
+        "handler": name,
+        "threads": threads,
+        "records": len(latencies),
+        "dropped": getattr(handler, "dropped", 0),
+        "seconds": round(elapsed, 3),
+        "latency_us": {
+            "mean": round(statistics.fmean(latencies) * 1e6, 1),
+            "p50": round(percentile(latencies, 50) * 1e6, 1),
+            "p95": round(percentile(latencies, 95) * 1e6, 1),
+            "p99": round(percentile(latencies, 99) * 1e6, 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--records", type=int, default=2000, help="per thread")
+    parser.add_argument("--io-delay-ms", type=float, default=0.0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    SlowFileHandler.delay = args.io_delay_ms / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        direct = SlowFileHandler(os.path.join(tmp, "direct.log"))
+        queued = QueuedHandler(
+            "__main__.SlowFileHandler",
+            maxsize=args.queue_size,
+            filename=os.path.join(tmp, "queued.log"),
+        )
+        report = [
+            run("FileHandler", direct, args.threads, args.records),
+            run("QueuedHandler", queued, args.threads, args.records),
+        ]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
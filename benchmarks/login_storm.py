@@ -0,0 +1,160 @@
+"""
+Measure read latency while a burst of logins hashes passwords, with the
+bounded hashing pool from src.core.hashing and with it effectively unbounded.
+
+Runs in-process against the configured database (fill it first, e.g. with
+``python manage.py generate_fake_data``) and models one gunicorn gthread
+worker as deployed: at most ``--threads`` requests are served at once and the
+rest wait for a free thread, as they would in the worker's accept queue.
+Reader clients fetch an article while login clients post credentials as fast
+as they can:
+
+    python benchmarks/login_storm.py --threads 8 --logins 32 --readers 4
+
+With a sync worker (one request per process) the pool's cap never triggers,
+so the bounded scenario only differs where threads > workers + queue.
+
+Results are printed as JSON: read latency without a storm, then during one
+for each pool configuration, plus how many logins succeeded or got 503.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blog.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connections  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+from src.articles.models import Article  # noqa: E402
+from src.users.models import User  # noqa: E402
+
+PASSWORD = "storm-password"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def reader(url, stop, server_threads):
+    client = Client(HTTP_HOST="localhost")
+    latencies = []
+    while not stop.is_set():
+        # Timed from the client's side, including the wait for a thread.
+        started = time.perf_counter()
+        with server_threads:
+            client.get(url)
+        latencies.append(time.perf_counter() - started)
+    connections.close_all()
+    return latencies
+
+
+def login(username, stop, server_threads):
+    client = Client(HTTP_HOST="localhost")
+    statuses = {}
+    while not stop.is_set():
+        with server_threads:
+            response = client.post(
+                "/api/v1/auth/login",
+                {"username": username, "password": PASSWORD},
+                content_type="application/json",
+            )
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    connections.close_all()
+    return statuses
+
+
+def run(name, url, username, threads, readers, logins, seconds):
+    stop = threading.Event()
+    server_threads = threading.BoundedSemaphore(threads)
+    with ThreadPoolExecutor(max_workers=readers + logins) as pool:
+        read_futures = [
+            pool.submit(reader, url, stop, server_threads) for _ in range(readers)
+        ]
+        login_futures = [
+            pool.submit(login, username, stop, server_threads) for _ in range(logins)
+        ]
+        time.sleep(seconds)
+        stop.set()
+        latencies = [t for f in read_futures for t in f.result()]
+        statuses = {}
+        for future in login_futures:
+            for status, count in future.result().items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    return {
+        "scenario": name,
+        "reads": len(latencies),
+        "read_latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+        },
+        "logins": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=8, help="gthread threads")
+    parser.add_argument("--logins", type=int, default=32, help="login clients")
+    parser.add_argument("--readers", type=int, default=4, help="reader clients")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=2, help="bounded pool size")
+    parser.add_argument("--queue", type=int, default=4, help="bounded pool queue")
+    args = parser.parse_args()
+
+    article = Article.objects.order_by("pk").first()
+    if article is None:
+        sys.exit("No articles, run manage.py generate_fake_data first")
+    url = f"/api/v1/articles/{article.pk}"
+    user = User.objects.create_user(
+        username=f"storm_{uuid.uuid4().hex[:8]}", password=PASSWORD
+    )
+    try:
+        report = [
+            run("idle", url, user.username, args.threads, args.readers, 0, args.seconds)
+        ]
+        scenarios = [
+            ("bounded", args.workers, args.queue),
+            ("unbounded", args.logins, args.logins),
+        ]
+        for name, workers, queue in scenarios:
+            with override_settings(
+                PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_QUEUE=queue
+            ):
+                report.append(
+                    run(
+                        f"storm/{name}",
+                        url,
+                        user.username,
+                        args.threads,
+                        args.readers,
+                        args.logins,
+                        args.seconds,
+                    )
+                )
+    finally:
+        user.delete()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare concurrent-request throughput of the sync (WSGI) and async (ASGI)
+deployments.
+
+Start both servers first, e.g. with ``docker compose up backend backend-asgi``,
+which run the same number of processes (GUNICORN_WORKERS) so only the server
+model differs, then run:
+
+    python benchmarks/wsgi_vs_asgi.py \\
+        --wsgi http://localhost:8000/api/v1/articles/ \\
+        --asgi http://localhost:8001/api/v1/async/articles/ \\
+        --concurrency 64 --requests 2000
+
+Results are printed as JSON, one entry per target.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url, timeout):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, TimeoutError):
+        status = None
+    return time.perf_counter() - started, status
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run(url, concurrency, total, timeout):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Warm up connections, imports and caches before measuring.
+        list(pool.map(lambda _: fetch(url, timeout), range(concurrency)))
+
+        started = time.perf_counter()
+        results = list(pool.map(lambda _: fetch(url, timeout), range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, status in results if status == 200]
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": total - len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+            "p50": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "p95": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+            "p99": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--wsgi", required=True, help="URL served by gunicorn")
+    parser.add_argument("--asgi", required=True, help="URL served by uvicorn")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    report = {
+        "wsgi": run(args.wsgi, args.concurrency, args.requests, args.timeout),
+        "asgi": run(args.asgi, args.concurrency, args.requests, args.timeout),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
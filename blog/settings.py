@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "src.core.metrics.MetricsMiddleware",
+    "src.core.db.ReplicaPinMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -85,15 +87,72 @@ WSGI_APPLICATION = "blog.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": os.getenv("DJANGO_DB_ENGINE", "django.db.backends.postgresql"),
         "NAME": os.getenv("DJANGO_DB_NAME"),
         "USER": os.getenv("DJANGO_DB_USER"),
         "PASSWORD": os.getenv("DJANGO_DB_PASSWORD"),
         "HOST": os.getenv("DJANGO_DB_HOST"),
         "PORT": os.getenv("DJANGO_DB_PORT"),
+        # Connections are reused for this many seconds and checked before
+        # reuse, instead of opened per request.
+        "CONN_MAX_AGE": int(os.getenv("DJANGO_DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# DJANGO_DB_POOL=1 switches PostgreSQL to psycopg 3's connection pool, shared
+# by the threads of each worker process; stats at /api/v1/internal/db.
+DB_POOL = os.getenv("DJANGO_DB_POOL") == "1"
+if DB_POOL and DATABASES["default"]["ENGINE"].endswith("postgresql"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DJANGO_DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DJANGO_DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DJANGO_DB_POOL_TIMEOUT", "10")),
+        }
+    }
+
+# Optional read replica, configured with DJANGO_DB_REPLICA_* (unset ones
+# default to the primary's). BaseCRUD list/detail reads go to it, except for
+# clients that wrote within the last REPLICA_PIN_SECONDS (see src.core.db).
+if os.getenv("DJANGO_DB_REPLICA_HOST") or os.getenv("DJANGO_DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "OPTIONS": dict(DATABASES["default"].get("OPTIONS", {})),
+        "TEST": {"MIRROR": "default"},
+    }
+    for key in ("NAME", "USER", "PASSWORD", "HOST", "PORT"):
+        value = os.getenv(f"DJANGO_DB_REPLICA_{key}")
+        if value:
+            DATABASES["replica"][key] = value
+
+DATABASE_ROUTERS = ["src.core.db.PrimaryReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("DJANGO_DB_REPLICA_PIN_SECONDS", "10"))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Point this at a shared backend (e.g. Redis or Memcached) when running more
+# than one worker, otherwise invalidations only reach the local process.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
+# Seconds to keep serialized BaseCRUD.retrieve() results; 0 disables caching.
+CRUD_CACHE_TIMEOUT = int(os.getenv("DJANGO_CRUD_CACHE_TIMEOUT", "0"))
+
+# Rows per INSERT issued by BaseCRUD.bulk_create() and the most items a single
+# bulk request may carry.
+BULK_CREATE_BATCH_SIZE = int(os.getenv("DJANGO_BULK_CREATE_BATCH_SIZE", "500"))
+BULK_CREATE_MAX_ITEMS = int(os.getenv("DJANGO_BULK_CREATE_MAX_ITEMS", "1000"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -113,6 +172,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PBKDF2 runs on a bounded thread pool (src.core.hashing) so a login burst
+# cannot take every CPU from other requests. Beyond PASSWORD_HASH_WORKERS
+# running and PASSWORD_HASH_QUEUE waiting, requests get 503 with Retry-After.
+# The cap is per process and only matters where a process serves concurrent
+# requests (gthread or ASGI); keep the sum below the server's thread count.
+PASSWORD_HASHERS = [
+    "src.core.hashing.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASH_WORKERS = int(os.getenv("DJANGO_PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE = int(os.getenv("DJANGO_PASSWORD_HASH_QUEUE", "4"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("DJANGO_PASSWORD_HASH_RETRY_AFTER", "1"))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -151,6 +226,31 @@ NINJA_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Seconds an authenticated user's id/flags are reused per process before the
+# users table is queried again; 0 looks the user up on every request.
+AUTH_USER_CACHE_TTL = int(os.getenv("DJANGO_AUTH_USER_CACHE_TTL", "30"))
+# Verified access tokens kept per process (LRU, each until its exp) so repeat
+# requests skip the JWT signature check; 0 disables.
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("DJANGO_AUTH_TOKEN_CACHE_SIZE", "10000"))
+
+# Records buffered per log handler before new ones are dropped.
+LOG_QUEUE_SIZE = int(os.getenv("DJANGO_LOG_QUEUE_SIZE", "10000"))
+# Repeats of the same error-handler line (per path and status) logged per
+# window; the rest are folded into a summary line. Audit lines and 500s are
+# never sampled.
+LOG_SAMPLE_LIMIT = int(os.getenv("DJANGO_LOG_SAMPLE_LIMIT", "20"))
+LOG_SAMPLE_WINDOW = float(os.getenv("DJANGO_LOG_SAMPLE_WINDOW", "60"))
+
+# Per-route SQL query budgets (src.core.metrics.query_budget): "warn" logs
+# requests over budget, "raise" fails them (the query budget tests), "off".
+QUERY_BUDGET_MODE = os.getenv("DJANGO_QUERY_BUDGET_MODE", "warn")
+
+# Source networks allowed to scrape /api/v1/metrics directly (not via nginx).
+METRICS_ALLOWED_NETWORKS = os.getenv(
+    "DJANGO_METRICS_ALLOWED_NETWORKS",
+    "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16",
+).split(",")
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -168,27 +268,44 @@ LOGGING = {
             "style": "{",
         },
     },
+    "filters": {
+        "sampled": {
+            "()": "src.core.log.SamplingFilter",
+            "limit": LOG_SAMPLE_LIMIT,
+            "window": LOG_SAMPLE_WINDOW,
+        },
+    },
+    # Every handler writes from a background thread behind a bounded queue
+    # (see src.core.log.QueuedHandler), so logging never blocks a request.
     "handlers": {
         "console": {
             "level": "INFO",
-            "class": "logging.StreamHandler",
+            "()": "src.core.log.QueuedHandler",
+            "target": "logging.StreamHandler",
+            "maxsize": LOG_QUEUE_SIZE,
             "formatter": "simple",
         },
         "file": {
             "level": "INFO",
-            "class": "logging.FileHandler",
+            "()": "src.core.log.QueuedHandler",
+            "target": "logging.FileHandler",
+            "maxsize": LOG_QUEUE_SIZE,
             "filename": BASE_DIR / "logs" / "django.log",
             "formatter": "detailed",
         },
         "auth_file": {
             "level": "INFO",
-            "class": "logging.FileHandler",
+            "()": "src.core.log.QueuedHandler",
+            "target": "logging.FileHandler",
+            "maxsize": LOG_QUEUE_SIZE,
             "filename": BASE_DIR / "logs" / "auth.log",
             "formatter": "detailed",
         },
         "crud_file": {
             "level": "INFO",
-            "class": "logging.FileHandler",
+            "()": "src.core.log.QueuedHandler",
+            "target": "logging.FileHandler",
+            "maxsize": LOG_QUEUE_SIZE,
             "filename": BASE_DIR / "logs" / "crud.log",
             "formatter": "detailed",
         },
@@ -207,11 +324,19 @@ LOGGING = {
         "src.core.auth": {
             "handlers": ["auth_file", "console"],
             "level": "INFO",
+            "filters": ["sampled"],
             "propagate": False,
         },
         "src.core.exceptions": {
             "handlers": ["auth_file", "console"],
             "level": "INFO",
+            "filters": ["sampled"],
+            "propagate": False,
+        },
+        "src.core.metrics": {
+            "handlers": ["file", "console"],
+            "level": "INFO",
+            "filters": ["sampled"],
             "propagate": False,
         },
         "src.core.services": {
@@ -1,42 +1,161 @@
-from typing import List
+from typing import Any, List, Literal, Optional
 
-from ninja import Router
+from django.http import HttpResponse
 
-from src.core.auth import jwt_auth
-from src.core.services import check_ownership
+from src.comments.schemas import CommentOutSchema
+from src.comments.services import CommentCRUD
+from src.core.responses import (
+    conditional_detail,
+    conditional_list,
+    partial_response,
+    set_validators,
+    stream_response,
+    wants_ndjson,
+)
+from src.core.routing import DualRouter, call
+from src.core.schemas import BulkResultSchema
 
 from .schemas import ArticleCreateSchema, ArticleOutSchema, ArticleUpdateSchema
 from .services import ArticleCRUD
 
-router = Router(tags=["Articles"])
+routes = DualRouter("Articles")
+router = routes.sync
+async_router = routes.asynchronous
 
 
-@router.get("/", response=List[ArticleOutSchema])
-def list_articles(request):
-    return ArticleCRUD.list()
+@routes.get(
+    "/",
+    response=List[ArticleOutSchema],
+    budget=1,
+    decorators=[conditional_list(ArticleCRUD)],
+)
+async def list_articles(
+    request,
+    response: HttpResponse,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    view: Literal["full", "summary"] = "full",
+):
+    if view == "summary":
+        fields = ArticleCRUD.summary_fields
+    if stream or wants_ndjson(request):
+        return stream_response(
+            request, ArticleCRUD.stream(cursor=cursor, fields=fields), ArticleOutSchema
+        )
+    articles, next_cursor = await call(
+        ArticleCRUD.list, cursor=cursor, limit=limit, fields=fields
+    )
+    if fields:
+        return partial_response(articles, next_cursor)
+    if next_cursor:
+        response["X-Next-Cursor"] = next_cursor
+    return articles
 
 
-@router.get("/{article_id}", response=ArticleOutSchema)
-def get_article(request, article_id: int):
-    return ArticleCRUD.retrieve(article_id)
+@routes.get("/search", response=List[ArticleOutSchema], budget=1)
+async def search_articles(
+    request,
+    response: HttpResponse,
+    q: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    articles, next_cursor = await call(
+        ArticleCRUD.search, q, cursor=cursor, limit=limit
+    )
+    if next_cursor:
+        response["X-Next-Cursor"] = next_cursor
+    return articles
 
 
-@router.post("/", response=ArticleOutSchema, auth=jwt_auth)
-def create_article(request, payload: ArticleCreateSchema):
-    return ArticleCRUD.create({**payload.dict(), "author_id": request.user.id})
+@routes.post("/bulk", response=List[BulkResultSchema], budget=4, auth=True)
+async def bulk_create_articles(request, payload: List[Any]):
+    # Each item is checked against ArticleCreateSchema on its own.
+    return await call(ArticleCRUD.bulk_create, payload, author_id=request.user.id)
 
 
-@router.put("/{article_id}", response=ArticleOutSchema, auth=jwt_auth)
-def update_article(request, article_id: int, payload: ArticleUpdateSchema):
-    article = ArticleCRUD.get_object(article_id)
-    check_ownership(article.author, request.user)
+@routes.get(
+    "/{article_id}",
+    response=ArticleOutSchema,
+    budget=1,
+    decorators=[conditional_detail(ArticleCRUD, "article_id")],
+)
+async def get_article(
+    request, response: HttpResponse, article_id: int, fields: Optional[str] = None
+):
+    article = await call(ArticleCRUD.retrieve, article_id, fields=fields)
+    return partial_response(article) if fields else article
+
+
+@routes.get(
+    "/{article_id}/comments",
+    response=List[CommentOutSchema],
+    budget=2,
+    decorators=[conditional_list(CommentCRUD)],
+)
+async def list_article_comments(
+    request,
+    response: HttpResponse,
+    article_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+):
+    if stream or wants_ndjson(request):
+        await call(CommentCRUD.ensure_article_exists, article_id)
+        return stream_response(
+            request,
+            CommentCRUD.stream(cursor=cursor, fields=fields, article_id=article_id),
+            CommentOutSchema,
+        )
+    comments, next_cursor = await call(
+        CommentCRUD.list_for_article,
+        article_id,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+    )
+    if fields:
+        return partial_response(comments, next_cursor)
+    if next_cursor:
+        response["X-Next-Cursor"] = next_cursor
+    return comments
+
+
+@routes.post("/", response=ArticleOutSchema, budget=6, auth=True)
+async def create_article(request, payload: ArticleCreateSchema):
+    article = await call(
+        ArticleCRUD.create, {**payload.dict(), "author_id": request.user.id}
+    )
+    # Re-read with the author joined; the async side can't lazy-load it.
+    return await call(ArticleCRUD.get_object, article.pk)
+
+
+@routes.put("/{article_id}", response=ArticleOutSchema, budget=5, auth=True)
+async def update_article(
+    request, response: HttpResponse, article_id: int, payload: ArticleUpdateSchema
+):
     data = payload.dict(exclude_unset=True)
-    return ArticleCRUD.update(article_id, data, user_id=request.user.id)
+    article = await call(
+        ArticleCRUD.update,
+        article_id,
+        data,
+        user_id=request.user.id,
+        if_match=request.headers.get("If-Match"),
+    )
+    set_validators(response, ArticleCRUD.version_of(article.pk, article))
+    return article
 
 
-@router.delete("/{article_id}", auth=jwt_auth)
-def delete_article(request, article_id: int):
-    article = ArticleCRUD.get_object(article_id)
-    check_ownership(article.author, request.user)
-    ArticleCRUD.delete(article_id, user_id=request.user.id)
+@routes.delete("/{article_id}", budget=6, auth=True)
+async def delete_article(request, article_id: int):
+    await call(
+        ArticleCRUD.delete,
+        article_id,
+        user_id=request.user.id,
+        if_match=request.headers.get("If-Match"),
+    )
     return {"success": True}
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from src.articles.models import Article
+from src.articles.services import summarize
+
+
+class Command(BaseCommand):
+    help = "Compute the stored excerpt and word count of existing articles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every article, not only those without an excerpt.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Article.objects.only("id", "content").order_by("pk")
+        if not options["all"]:
+            queryset = queryset.filter(excerpt="")
+
+        batch = []
+        updated = 0
+        for article in queryset.iterator(chunk_size=batch_size):
+            for field, value in summarize(article.content).items():
+                setattr(article, field, value)
+            batch.append(article)
+            if len(batch) >= batch_size:
+                updated += self._flush(batch)
+                batch = []
+        if batch:
+            updated += self._flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} articles"))
+
+    def _flush(self, batch):
+        Article.objects.bulk_update(batch, ["excerpt", "word_count"])
+        return len(batch)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from src.articles.models import Article
+from src.comments.services import CommentCRUD
+
+
+class Command(BaseCommand):
+    help = "Recompute Article.comment_count from the comments table."
+
+    def handle(self, *args, **options):
+        updated = CommentCRUD.recount(Article.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {updated} articles"))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-created_at', '-id'], name='articles_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=300, verbose_name='excerpt'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='word count'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:37
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    Comment = apps.get_model('comments', 'Comment')
+    counts = (
+        Comment.objects.filter(article=OuterRef('pk'))
+        .order_by()
+        .values('article')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Article.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_article_excerpt'),
+        ('comments', '0004_article_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='comment count'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+class AddIndexOnPostgres(migrations.AddIndex):
+    # GIN indexes only exist on PostgreSQL; other backends (the SQLite test
+    # setup) keep the index in model state but skip the DDL.
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def fill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Article = apps.get_model('articles', 'Article')
+    Article.objects.update(
+        search_vector=SearchVector('title', weight='A', config='english')
+        + SearchVector('content', weight='B', config='english')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_article_comment_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='search vector'),
+        ),
+        AddIndexOnPostgres(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='articles_search_idx'),
+        ),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+    ]
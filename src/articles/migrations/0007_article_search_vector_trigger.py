@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 21:05
+
+from django.db import migrations
+
+# Keeps search_vector in step with title and content on every write path
+# (ORM saves, bulk_create, queryset.update(), the admin, loaddata), matching
+# SearchVector('title', weight='A') + SearchVector('content', weight='B').
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION articles_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(NEW.content, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER articles_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, content ON articles
+FOR EACH ROW EXECUTE FUNCTION articles_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS articles_search_vector_trigger ON articles;
+DROP FUNCTION IF EXISTS articles_search_vector_update();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # No params: several statements in one simple-protocol query.
+        schema_editor.execute(CREATE_TRIGGER, params=None)
+        # Rows written outside ArticleCRUD since 0006 may be stale or NULL.
+        schema_editor.execute('UPDATE articles SET title = title')
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGER, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_article_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
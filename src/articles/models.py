@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from src.core.models import TimestampedModel
@@ -7,6 +9,10 @@ from src.users.models import User
 class Article(TimestampedModel):
     title = models.CharField("title", max_length=200)
     content = models.TextField("content")
+    excerpt = models.CharField("excerpt", max_length=300, blank=True, default="")
+    word_count = models.PositiveIntegerField("word count", default=0)
+    comment_count = models.PositiveIntegerField("comment count", default=0)
+    search_vector = SearchVectorField("search vector", null=True, editable=False)
 
     author = models.ForeignKey(
         User,
@@ -18,6 +24,10 @@ class Article(TimestampedModel):
     class Meta:
         db_table = "articles"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="articles_created_id_idx"),
+            GinIndex(fields=["search_vector"], name="articles_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -21,6 +21,9 @@ class ArticleOutSchema(Schema):
     id: int
     title: str
     content: str
+    excerpt: str
+    word_count: int
+    comment_count: int
     author: UserOutSchema
     created_at: datetime
     updated_at: datetime
@@ -1,15 +1,99 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+
 from src.articles.models import Article
 from src.core.services import BaseCRUD
 
 from .schemas import ArticleCreateSchema, ArticleOutSchema, ArticleUpdateSchema
 
+EXCERPT_LENGTH = 280
+SEARCH_CONFIG = "english"
+
+
+def summarize(content: str) -> Dict[str, Any]:
+    words = content.split()
+    excerpt = " ".join(words)
+    if len(excerpt) > EXCERPT_LENGTH:
+        excerpt = excerpt[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+    return {"excerpt": excerpt, "word_count": len(words)}
+
 
 class ArticleCRUD(BaseCRUD):
     model = Article
     create_schema = ArticleCreateSchema
     update_schema = ArticleUpdateSchema
     out_schema = ArticleOutSchema
+    owner_field = "author_id"
+    # comment_count moves with F() updates that leave updated_at alone; the
+    # embedded author has its own.
+    etag_fields = ("updated_at", "comment_count", "author__updated_at")
+    cache_dependents = (("src.comments.services.CommentCRUD", "article_id"),)
+    # Everything an article index needs, without reading the content column.
+    summary_fields = (
+        "id,title,excerpt,word_count,comment_count,author.username,created_at"
+    )
 
     @classmethod
     def get_queryset(cls):
-        return cls.model.objects.select_related("author").all()
+        return cls.model.objects.select_related("author").defer("search_vector")
+
+    @classmethod
+    def search(
+        cls, q: str, cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> Tuple[List[Article], Optional[str]]:
+        queryset = cls.get_queryset()
+        if connection.vendor != "postgresql":
+            # No tsvector outside PostgreSQL (e.g. the SQLite test setup).
+            queryset = queryset.filter(Q(title__icontains=q) | Q(content__icontains=q))
+            return cls.paginate(queryset, cursor, limit)
+
+        query = SearchQuery(q, search_type="websearch", config=SEARCH_CONFIG)
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F("search_vector"), query)
+        )
+        return cls.paginate(queryset, cursor, limit, keys=("rank", "id"))
+
+    @classmethod
+    def _with_summary(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        if "content" in data:
+            return {**data, **summarize(data["content"])}
+        return data
+
+    @classmethod
+    def create(cls, data: Dict[str, Any]) -> Article:
+        return super().create(cls._with_summary(data))
+
+    @classmethod
+    async def acreate(cls, data: Dict[str, Any]) -> Article:
+        return await super().acreate(cls._with_summary(data))
+
+    @classmethod
+    def bulk_data(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        return cls._with_summary(data)
+
+    @classmethod
+    def update(
+        cls,
+        pk: int,
+        data: Dict[str, Any],
+        user_id: int = None,
+        if_match: Optional[str] = None,
+    ) -> Article:
+        return super().update(
+            pk, cls._with_summary(data), user_id=user_id, if_match=if_match
+        )
+
+    @classmethod
+    async def aupdate(
+        cls,
+        pk: int,
+        data: Dict[str, Any],
+        user_id: int = None,
+        if_match: Optional[str] = None,
+    ) -> Article:
+        return await super().aupdate(
+            pk, cls._with_summary(data), user_id=user_id, if_match=if_match
+        )
@@ -1,47 +1,111 @@
-from typing import List
+from typing import Any, List, Optional
 
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from ninja import Router
 
 from src.articles.models import Article
-from src.core.auth import jwt_auth
-from src.core.services import check_ownership
+from src.core.responses import (
+    conditional_detail,
+    conditional_list,
+    partial_response,
+    set_validators,
+    stream_response,
+    wants_ndjson,
+)
+from src.core.routing import DualRouter, call
+from src.core.schemas import BulkResultSchema
 
 from .schemas import CommentCreateSchema, CommentOutSchema, CommentUpdateSchema
-from .services import CommentCRUD
+from .services import CommentCRUD, comment_filters
 
-router = Router(tags=["Comments"])
+routes = DualRouter("Comments")
+router = routes.sync
+async_router = routes.asynchronous
 
 
-@router.get("/", response=List[CommentOutSchema])
-def list_comments(request):
-    return CommentCRUD.list()
+@routes.get(
+    "/",
+    response=List[CommentOutSchema],
+    budget=1,
+    decorators=[conditional_list(CommentCRUD)],
+)
+async def list_comments(
+    request,
+    response: HttpResponse,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    article_id: Optional[int] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+):
+    filters = comment_filters(article_id)
+    if stream or wants_ndjson(request):
+        return stream_response(
+            request,
+            CommentCRUD.stream(cursor=cursor, fields=fields, **filters),
+            CommentOutSchema,
+        )
+    comments, next_cursor = await call(
+        CommentCRUD.list, cursor=cursor, limit=limit, fields=fields, **filters
+    )
+    if fields:
+        return partial_response(comments, next_cursor)
+    if next_cursor:
+        response["X-Next-Cursor"] = next_cursor
+    return comments
 
 
-@router.get("/{comment_id}", response=CommentOutSchema)
-def get_comment(request, comment_id: int):
-    return CommentCRUD.retrieve(comment_id)
+@routes.post("/bulk", response=List[BulkResultSchema], budget=6, auth=True)
+async def bulk_create_comments(request, payload: List[Any]):
+    # Each item is checked against CommentCreateSchema on its own.
+    return await call(CommentCRUD.bulk_create, payload, author_id=request.user.id)
 
 
-@router.post("/", response=CommentOutSchema, auth=jwt_auth)
-def create_comment(request, payload: CommentCreateSchema):
+@routes.get(
+    "/{comment_id}",
+    response=CommentOutSchema,
+    budget=1,
+    decorators=[conditional_detail(CommentCRUD, "comment_id")],
+)
+async def get_comment(
+    request, response: HttpResponse, comment_id: int, fields: Optional[str] = None
+):
+    comment = await call(CommentCRUD.retrieve, comment_id, fields=fields)
+    return partial_response(comment) if fields else comment
+
+
+@routes.post("/", response=CommentOutSchema, budget=9, auth=True)
+async def create_comment(request, payload: CommentCreateSchema):
     data = payload.dict()
-    data["article"] = get_object_or_404(Article, id=data.pop("article_id"))
+    data["article"] = await call(get_object_or_404, Article, id=data.pop("article_id"))
     data["author_id"] = request.user.id
-    return CommentCRUD.create(data)
+    comment = await call(CommentCRUD.create, data)
+    # Re-read with the author joined; the async side can't lazy-load it.
+    return await call(CommentCRUD.get_object, comment.pk)
 
 
-@router.put("/{comment_id}", response=CommentOutSchema, auth=jwt_auth)
-def update_comment(request, comment_id: int, payload: CommentUpdateSchema):
-    comment = CommentCRUD.get_object(comment_id)
-    check_ownership(comment.author, request.user)
+@routes.put("/{comment_id}", response=CommentOutSchema, budget=5, auth=True)
+async def update_comment(
+    request, response: HttpResponse, comment_id: int, payload: CommentUpdateSchema
+):
     data = payload.dict(exclude_unset=True)
-    return CommentCRUD.update(comment_id, data, comment.author.id)
+    comment = await call(
+        CommentCRUD.update,
+        comment_id,
+        data,
+        request.user.id,
+        if_match=request.headers.get("If-Match"),
+    )
+    set_validators(response, CommentCRUD.version_of(comment.pk, comment))
+    return comment
 
 
-@router.delete("/{comment_id}", auth=jwt_auth)
-def delete_comment(request, comment_id: int):
-    comment = CommentCRUD.get_object(comment_id)
-    check_ownership(comment.author, request.user)
-    CommentCRUD.delete(comment_id, comment.author.id)
+@routes.delete("/{comment_id}", budget=6, auth=True)
+async def delete_comment(request, comment_id: int):
+    await call(
+        CommentCRUD.delete,
+        comment_id,
+        request.user.id,
+        if_match=request.headers.get("If-Match"),
+    )
     return {"success": True}
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_created_id_index'),
+        ('comments', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-created_at', '-id'], name='comments_created_id_idx'),
+        ),
+    ]
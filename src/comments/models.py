@@ -25,6 +25,13 @@ class Comment(TimestampedModel):
     class Meta:
         db_table = "comments"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["article", "-created_at", "-id"],
+                name="comments_article_created_idx",
+            ),
+            models.Index(fields=["-created_at", "-id"], name="comments_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.article}"
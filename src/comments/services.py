@@ -1,15 +1,118 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.http import Http404
+
+from src.articles.models import Article
+from src.articles.services import ArticleCRUD
 from src.comments.models import Comment
 from src.core.services import BaseCRUD
 
 from .schemas import CommentCreateSchema, CommentOutSchema, CommentUpdateSchema
 
 
+def comment_filters(article_id: Optional[int]) -> Dict[str, Any]:
+    return {"article_id": article_id} if article_id is not None else {}
+
+
 class CommentCRUD(BaseCRUD):
     model = Comment
     create_schema = CommentCreateSchema
     update_schema = CommentUpdateSchema
     out_schema = CommentOutSchema
+    owner_field = "author_id"
+    field_lookups = {"article_title": "article__title"}
+    # The embedded author and article_title change with their own rows.
+    etag_fields = ("updated_at", "author__updated_at", "article__updated_at")
 
     @classmethod
     def get_queryset(cls):
         return cls.model.objects.select_related("article", "author").all()
+
+    @classmethod
+    def after_create(cls, instance: Comment) -> None:
+        Article.objects.filter(pk=instance.article_id).update(
+            comment_count=F("comment_count") + 1
+        )
+        ArticleCRUD.drop_cached([instance.article_id])
+
+    @classmethod
+    def bulk_errors(
+        cls, items: Dict[int, Dict[str, Any]]
+    ) -> Dict[int, Dict[str, List[str]]]:
+        article_ids = {data["article_id"] for data in items.values()}
+        existing = Article.objects.only("id").in_bulk(article_ids)
+        return {
+            index: {"article_id": ["Article not found"]}
+            for index, data in items.items()
+            if data["article_id"] not in existing
+        }
+
+    @classmethod
+    def after_bulk_create(cls, instances: List[Comment]) -> None:
+        article_ids = {instance.article_id for instance in instances}
+        cls.recount(Article.objects.filter(pk__in=article_ids))
+        ArticleCRUD.drop_cached(article_ids)
+
+    @classmethod
+    def before_delete(cls, queryset: QuerySet) -> List[int]:
+        # A plain read: missing, foreign or stale comments match nothing and
+        # the counter is only written once the DELETE removed a row.
+        return list(queryset.values_list("article_id", flat=True))
+
+    @classmethod
+    def after_delete(cls, article_ids: List[int]) -> None:
+        Article.objects.filter(pk__in=article_ids).update(
+            comment_count=Greatest(F("comment_count") - 1, 0)
+        )
+        ArticleCRUD.drop_cached(article_ids)
+
+    @classmethod
+    def recount(cls, articles: QuerySet, **exclude) -> int:
+        # One UPDATE with a correlated COUNT subquery, however many articles.
+        counts = (
+            Comment.objects.filter(article=OuterRef("pk"))
+            .exclude(**exclude)
+            .order_by()
+            .values("article")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return articles.update(comment_count=Coalesce(Subquery(counts), 0))
+
+    @classmethod
+    def ensure_article_exists(cls, article_id: int) -> None:
+        if not Article.objects.filter(pk=article_id).exists():
+            raise Http404("Article not found")
+
+    @classmethod
+    async def aensure_article_exists(cls, article_id: int) -> None:
+        if not await Article.objects.filter(pk=article_id).aexists():
+            raise Http404("Article not found")
+
+    @classmethod
+    def list_for_article(
+        cls,
+        article_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
+    ) -> Tuple[List[Any], Optional[str]]:
+        cls.ensure_article_exists(article_id)
+        return cls.list(
+            cursor=cursor, limit=limit, fields=fields, article_id=article_id
+        )
+
+    @classmethod
+    async def alist_for_article(
+        cls,
+        article_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
+    ) -> Tuple[List[Any], Optional[str]]:
+        await cls.aensure_article_exists(article_id)
+        return await cls.alist(
+            cursor=cursor, limit=limit, fields=fields, article_id=article_id
+        )
@@ -1,11 +1,17 @@
+from django.core.exceptions import PermissionDenied
 from ninja_extra import NinjaExtraAPI
 
+from src.articles.api import async_router as articles_async_router
 from src.articles.api import router as articles_router
+from src.comments.api import async_router as comments_async_router
 from src.comments.api import router as comments_router
+from src.core.db import connection_stats
 from src.core.exceptions import configure_exception_handlers
+from src.core.metrics import metrics_response, query_budget, scrape_allowed
+from src.users.api import async_router as users_async_router
 from src.users.api import router as users_router
 
-from .auth import CustomAuthController
+from .auth import CustomAuthController, jwt_auth
 
 api = NinjaExtraAPI()
 
@@ -16,3 +22,23 @@ api.register_controllers(CustomAuthController)
 api.add_router("/users/", users_router)
 api.add_router("/articles/", articles_router)
 api.add_router("/comments/", comments_router)
+
+api.add_router("/async/users/", users_async_router)
+api.add_router("/async/articles/", articles_async_router)
+api.add_router("/async/comments/", comments_async_router)
+
+
+@api.get("/metrics", include_in_schema=False)
+@query_budget(0)
+def metrics(request):
+    if not scrape_allowed(request):
+        raise PermissionDenied()
+    return metrics_response()
+
+
+@api.get("/internal/db", auth=jwt_auth, include_in_schema=False)
+@query_budget(1)
+def database_stats(request):
+    if not request.user.is_staff:
+        raise PermissionDenied()
+    return connection_stats()
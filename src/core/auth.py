@@ -1,33 +1,212 @@
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db import IntegrityError, transaction
 from django.http import HttpRequest
 from ninja.errors import HttpError
 from ninja_extra import api_controller, http_post
-from ninja_jwt.authentication import JWTAuth
-from ninja_jwt.exceptions import TokenError
+from ninja_extra.security import AsyncHttpBearer
+from ninja_jwt.authentication import AsyncJWTBaseAuthentication, JWTAuth
+from ninja_jwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
 from ninja_jwt.schema import (
     TokenObtainPairInputSchema,
     TokenObtainPairOutputSchema,
     TokenRefreshInputSchema,
     TokenRefreshOutputSchema,
 )
-from ninja_jwt.tokens import RefreshToken
+from ninja_jwt.settings import api_settings
+from ninja_jwt.tokens import RefreshToken, Token
 
 from src.users.schemas import UserCreateSchema
 
+from .metrics import TOKEN_CACHE, query_budget
 from .schemas import RegisterSuccessSchema
 
 logger = logging.getLogger("src.core.auth")
 
-jwt_auth = JWTAuth()
 User = get_user_model()
 
 
+class AuthUser:
+    """Lightweight stand-in for ``User`` on authenticated requests.
+
+    Carries only the columns permission checks need.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+    fields = ("id", "username", "is_active", "is_staff", "is_superuser")
+
+    def __init__(self, id, username, is_active, is_staff, is_superuser):
+        self.id = id
+        self.username = username
+        self.is_active = is_active
+        self.is_staff = is_staff
+        self.is_superuser = is_superuser
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __eq__(self, other):
+        if isinstance(other, (AuthUser, User)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return self.username
+
+
+_user_cache: Dict[int, Tuple[float, Tuple]] = {}
+_user_cache_lock = threading.Lock()
+
+
+def get_auth_user(user_id: int) -> Optional[AuthUser]:
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+    if entry and entry[0] > now:
+        return AuthUser(*entry[1])
+
+    row = User.objects.filter(pk=user_id).values_list(*AuthUser.fields).first()
+    if row is None:
+        return None
+    ttl = settings.AUTH_USER_CACHE_TTL
+    if ttl > 0:
+        with _user_cache_lock:
+            _user_cache[user_id] = (now + ttl, row)
+    return AuthUser(*row)
+
+
+def invalidate_auth_user(user_id: int) -> None:
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+def clear_auth_user_cache() -> None:
+    with _user_cache_lock:
+        _user_cache.clear()
+
+
+class VerifiedTokenCache:
+    """
+    Per-process LRU of access tokens whose signature and claims have been
+    checked, keyed by a SHA-256 digest of the raw token and kept until the
+    token's own expiry. Only the signature check is skipped on a hit; the
+    user is still looked up (and may be rejected) on every request.
+    """
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Tuple[float, Token]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(raw_token) -> str:
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).hexdigest()
+
+    def get(self, raw_token) -> Optional[Token]:
+        key = self.key(raw_token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self.entries[key]
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+        TOKEN_CACHE.labels("hit" if entry else "miss").inc()
+        return entry[1] if entry else None
+
+    def put(self, raw_token, token: Token) -> None:
+        maxsize = settings.AUTH_TOKEN_CACHE_SIZE
+        expires = token.get("exp")
+        if maxsize <= 0 or expires is None:
+            return
+        with self.lock:
+            self.entries[self.key(raw_token)] = (expires, token)
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+
+    def evict(self, raw_token) -> None:
+        if not raw_token:
+            return
+        with self.lock:
+            self.entries.pop(self.key(raw_token), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = VerifiedTokenCache()
+
+
+def bearer_token(request: HttpRequest) -> Optional[str]:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+class CachedJWTAuth(JWTAuth):
+    @classmethod
+    def get_validated_token(cls, raw_token) -> Token:
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token) -> AuthUser:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            ) from e
+
+        user = get_auth_user(user_id)
+        if user is None:
+            raise AuthenticationFailed("User not found")
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive")
+        return user
+
+
+class AsyncCachedJWTAuth(AsyncJWTBaseAuthentication, CachedJWTAuth, AsyncHttpBearer):
+    async def authenticate(self, request: HttpRequest, token: str) -> AuthUser:
+        return await self.async_jwt_authenticate(request, token)
+
+    async def async_jwt_authenticate(self, request: HttpRequest, token: str):
+        # Token validation is CPU only (and usually a cache hit), so it runs
+        # inline; only the user lookup needs the sync thread.
+        request.user = AnonymousUser()
+        validated_token = self.get_validated_token(token)
+        user = await sync_to_async(self.get_user)(validated_token)
+        request.user = user
+        return user
+
+
+jwt_auth = CachedJWTAuth()
+async_jwt_auth = AsyncCachedJWTAuth()
+
+
 @api_controller("/auth", tags=["Auth"])
 class CustomAuthController:
     @http_post("/login", response=TokenObtainPairOutputSchema, auth=None)
+    @query_budget(3)
     def login(self, request: HttpRequest, data: TokenObtainPairInputSchema):
         user = authenticate(username=data.username, password=data.password)
         if not user:
@@ -36,7 +215,7 @@ class CustomAuthController:
         refresh = RefreshToken.for_user(user)
 
         user_logged_in.send(sender=User, request=request, user=user)
-        logger.info(f"User '{user.username}' (ID: {user.id}) logged.")
+        logger.info("User '%s' (ID: %s) logged.", user.username, user.id)
 
         return {
             "refresh": str(refresh),
@@ -49,28 +228,35 @@ class CustomAuthController:
         response={200: RegisterSuccessSchema, 201: RegisterSuccessSchema},
         auth=None,
     )
+    @query_budget(3)
     def register(self, request: HttpRequest, data: UserCreateSchema):
-        if User.objects.filter(username=data.username).exists():
-            raise HttpError(400, "Username already exists")
-
+        # Hash before the transaction opens; the unique constraint on username
+        # settles concurrent sign-ups instead of an exists() probe.
+        password = make_password(data.password)
         try:
-            user = User.objects.create_user(
-                username=data.username, password=data.password
-            )
-
-            logger.info(f"New user '{user.username}' registered and logged in")
-            return 201, {"success": True, "message": "User registered successfully"}
-
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=User.normalize_username(data.username),
+                    password=password,
+                )
+        except IntegrityError:
+            raise HttpError(400, "Username already exists")
         except Exception as e:
-            logger.error(f"Registration failed for {data.username}: {str(e)}")
+            logger.error("Registration failed for %s: %s", data.username, e)
             raise HttpError(500, "Registration failed")
 
+        logger.info("New user '%s' registered and logged in", user.username)
+        return 201, {"success": True, "message": "User registered successfully"}
+
     @http_post(
         "/refresh",
         response=TokenRefreshOutputSchema,
         auth=None,
     )
+    @query_budget(0)
     def refresh_token(self, request, data: TokenRefreshInputSchema):
+        # The access token being replaced, if the client sent it along.
+        token_cache.evict(bearer_token(request))
         try:
             refresh_token = RefreshToken(data.refresh)
             access_token = str(refresh_token.access_token)
@@ -83,8 +269,10 @@ class CustomAuthController:
             raise HttpError(401, "Invalid refresh token")
 
     @http_post("/logout", auth=jwt_auth)
+    @query_budget(1)
     def logout(self, request):
+        token_cache.evict(bearer_token(request))
         user = request.user
         user_logged_out.send(sender=User, request=request, user=user)
-        logger.info(f"User '{user.username}' (ID: {user.id}) logged out.")
+        logger.info("User '%s' (ID: %s) logged out.", user.username, user.id)
         return {"success": True}
@@ -0,0 +1,131 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+REPLICA = "replica"
+PIN_COOKIE = "primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Set by BaseCRUD around reads that may be served slightly stale.
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+# Set per request for clients that wrote recently (read-your-writes).
+_pinned: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA in connections.settings
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes always go to the primary. Reads go to the replica only inside
+    replica_reads() and only while the client is not pinned to the primary;
+    everything else keeps Django's default routing.
+    """
+
+    def db_for_read(self, model, **hints):
+        if hints.get("instance") is not None:
+            return None
+        if _replica_reads.get() and not _pinned.get() and replica_configured():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+
+class ReplicaPinMiddleware:
+    """
+    After a successful write, sets a cookie holding the time until which the
+    client's reads stay on the primary (REPLICA_PIN_SECONDS), so it sees its
+    own changes despite replication lag. Not installed without a replica.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _pinned.set(self.pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request: HttpRequest):
+        token = _pinned.set(self.pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.pin(request, response)
+
+    def pinned(self, request: HttpRequest) -> bool:
+        if request.method not in SAFE_METHODS:
+            return True
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def pin(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            window = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PIN_COOKIE,
+                str(int(time.time() + window)),
+                max_age=window,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def connection_stats(alias: str = DEFAULT_DB_ALIAS) -> dict:
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    stats = {
+        "alias": alias,
+        "vendor": connection.vendor,
+        "conn_max_age": settings_dict["CONN_MAX_AGE"],
+        "health_checks": settings_dict["CONN_HEALTH_CHECKS"],
+        "pool": None,
+    }
+    # Only the PostgreSQL backend has a pool, and only with OPTIONS["pool"].
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        pool_stats = pool.get_stats()
+        waited = pool_stats.get("requests_queued", 0)
+        pool_stats["requests_wait_ms_avg"] = (
+            round(pool_stats.get("requests_wait_ms", 0) / waited, 2) if waited else 0
+        )
+        stats["pool"] = pool_stats
+    return stats
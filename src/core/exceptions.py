@@ -6,15 +6,25 @@ from ninja.errors import HttpError
 from ninja_extra import NinjaExtraAPI
 from ninja_jwt.exceptions import InvalidToken, TokenError
 
+from .hashing import PasswordHashingBusy
+
 logger = logging.getLogger("src.core.exceptions")
 
 
+def _sample_key(request, status: int) -> dict:
+    # Read by src.core.log.SamplingFilter to group repeated errors.
+    return {"path": request.path, "status": status}
+
+
 def configure_exception_handlers(api: NinjaExtraAPI):
 
     @api.exception_handler(PermissionDenied)
     def permission_denied_handler(request, exc):
         logger.warning(
-            f"Access denied: {request.path} - User: {getattr(request.user, 'username', 'Anonymous')}"
+            "Access denied: %s - User: %s",
+            request.path,
+            getattr(request.user, "username", "Anonymous"),
+            extra=_sample_key(request, 403),
         )
         return api.create_response(request, {"detail": "Permission denied"}, status=403)
 
@@ -22,17 +32,28 @@ def configure_exception_handlers(api: NinjaExtraAPI):
     def http_error_handler(request, exc: HttpError):
         if exc.status_code == 401:
             logger.info(
-                f"Unauthorized access attempt to {request.path} - User: {getattr(request.user, 'username', 'Anonymous')}"
+                "Unauthorized access attempt to %s - User: %s",
+                request.path,
+                getattr(request.user, "username", "Anonymous"),
+                extra=_sample_key(request, 401),
             )
         else:
-            logger.warning(f"HTTP {exc.status_code} at {request.path}: {exc.message}")
+            logger.warning(
+                "HTTP %s at %s: %s",
+                exc.status_code,
+                request.path,
+                exc.message,
+                extra=_sample_key(request, exc.status_code),
+            )
         return api.create_response(
             request, {"detail": exc.message}, status=exc.status_code
         )
 
     @api.exception_handler(InvalidToken)
     def invalid_token_handler(request, exc):
-        logger.warning(f"Invalid token attempt: {request.path}")
+        logger.warning(
+            "Invalid token attempt: %s", request.path, extra=_sample_key(request, 401)
+        )
         return api.create_response(
             request,
             {"detail": "Invalid or expired token", "code": "token_invalid"},
@@ -41,7 +62,12 @@ def configure_exception_handlers(api: NinjaExtraAPI):
 
     @api.exception_handler(TokenError)
     def token_error_handler(request, exc):
-        logger.warning(f"Token error: {str(exc)} - Path: {request.path}")
+        logger.warning(
+            "Token error: %s - Path: %s",
+            exc,
+            request.path,
+            extra=_sample_key(request, 401),
+        )
         return api.create_response(
             request,
             {
@@ -52,16 +78,36 @@ def configure_exception_handlers(api: NinjaExtraAPI):
             status=401,
         )
 
+    @api.exception_handler(PasswordHashingBusy)
+    def hashing_busy_handler(request, exc: PasswordHashingBusy):
+        logger.warning(
+            "Password hashing at capacity: %s",
+            request.path,
+            extra=_sample_key(request, 503),
+        )
+        response = api.create_response(
+            request,
+            {"detail": "Server busy, retry later", "code": "hashing_busy"},
+            status=503,
+        )
+        response["Retry-After"] = str(exc.retry_after)
+        return response
+
     @api.exception_handler(Http404)
     def not_found_handler(request, exc):
-        logger.info(f"404 Not Found: {request.path}")
+        logger.info("404 Not Found: %s", request.path, extra=_sample_key(request, 404))
         return api.create_response(
             request, {"detail": "Resource not found"}, status=404
         )
 
     @api.exception_handler(Exception)
     def general_exception_handler(request, exc):
-        logger.error(f"Unexpected error in {request.path}: {str(exc)}", exc_info=True)
+        logger.error(
+            "Unexpected error in %s: %s",
+            request.path,
+            exc,
+            exc_info=True,
+        )
         return api.create_response(
             request,
             {"detail": "Internal server error", "code": "internal_error"},
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class PasswordHashingBusy(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Too many password hashes in progress")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    """
+    Runs password hashing on a few dedicated threads, so a burst of logins
+    cannot occupy every CPU. At most `workers` hashes run at once and `queue`
+    more may wait; callers beyond that get PasswordHashingBusy straight away.
+    Sync callers still hold their request thread while waiting, so this only
+    bounds anything on servers that run concurrent requests per process.
+    """
+
+    def __init__(self, workers: int, queue: int, retry_after: int):
+        self.local = threading.local()
+        self.executor = ThreadPoolExecutor(
+            workers, thread_name_prefix="hashing", initializer=self._mark_worker
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue)
+        self.retry_after = retry_after
+
+    def _mark_worker(self):
+        self.local.worker = True
+
+    def submit(self, fn, *args) -> Future:
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashingBusy(self.retry_after)
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def run(self, fn, *args):
+        # Hashers call back into the pool; on a pool thread just run inline.
+        if getattr(self.local, "worker", False):
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+_pool: Optional[HashingPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> HashingPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    settings.PASSWORD_HASH_WORKERS,
+                    settings.PASSWORD_HASH_QUEUE,
+                    settings.PASSWORD_HASH_RETRY_AFTER,
+                )
+    return _pool
+
+
+@receiver(setting_changed)
+def reset_pool(setting, **kwargs):
+    global _pool
+    if setting.startswith("PASSWORD_HASH_") and _pool is not None:
+        with _pool_lock:
+            _pool.shutdown()
+            _pool = None
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # Same algorithm name as Django's, so existing hashes keep verifying;
+    # authenticate(), create_user() and make_password() all end up here.
+    def encode(self, password, salt, iterations=None):
+        return get_pool().run(super().encode, password, salt, iterations)
+
+
+async def amake_password(password: str) -> str:
+    return await get_pool().arun(make_password, password)
@@ -0,0 +1,146 @@
+import copy
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from django.utils.module_loading import import_string
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # At shutdown wait for room instead of failing on a full queue.
+        self.queue.put(self._sentinel)
+
+
+class QueuedHandler(QueueHandler):
+    """
+    Hands records to a background thread that owns the real (file/console)
+    handler, so request threads never wait on I/O. The queue is bounded: when
+    the writer falls behind, new records are dropped and counted instead of
+    blocking, and the count is reported once the queue has room again.
+
+    Configured through LOGGING with "()": "src.core.log.QueuedHandler";
+    `target` is the wrapped handler class and any extra keys are passed to it.
+    """
+
+    def __init__(self, target: str, maxsize: int = 10000, **kwargs):
+        super().__init__(queue.Queue(maxsize))
+        self.target = import_string(target)(**kwargs)
+        self.dropped = 0
+        self.listener = _Listener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, in the target handler.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only the %-interpolation is done here, while the arguments are
+        # still in the state the caller logged them in.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            notice = logging.makeLogRecord(
+                {
+                    "name": record.name,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "Dropped %s log records, queue was full" % self.dropped,
+                }
+            )
+            try:
+                self.queue.put_nowait(notice)
+                self.dropped = 0
+            except queue.Full:
+                pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # Flush what is queued before the process exits (logging.shutdown).
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets the first `limit` records per `path`/`status` extras through per
+    `window` seconds and counts the rest. Only records logged with those
+    extras (the repetitive error-handler lines) are sampled; audit lines and
+    anything else always pass. When a window closes with records suppressed,
+    a summary line with the count is logged in their place, on the next
+    record the filter sees.
+
+    Attach it to a logger in LOGGING, e.g.
+    "filters": {"sampled": {"()": "src.core.log.SamplingFilter", "limit": 20}}.
+    """
+
+    def __init__(self, limit: int = 10, window: float = 60.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.lock = threading.Lock()
+        # key -> [window start, records seen, first record]
+        self.counts = {}
+        self.next_sweep = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampling_summary", False):
+            return True
+        if getattr(record, "path", None) is None:
+            return True
+
+        now = time.monotonic()
+        key = self._key(record)
+        with self.lock:
+            summaries = self._sweep(now) if now >= self.next_sweep else []
+            entry = self.counts.setdefault(key, [now, 0, record])
+            entry[1] += 1
+            allowed = entry[1] <= self.limit
+
+        for summary in summaries:
+            logging.getLogger(summary.name).handle(summary)
+        return allowed
+
+    def _key(self, record: logging.LogRecord) -> tuple:
+        return record.name, record.levelno, record.path, getattr(record, "status", None)
+
+    def _sweep(self, now: float) -> list:
+        # Closing expired windows walks every key, so it runs at most once a
+        # second rather than on every record.
+        self.next_sweep = now + min(self.window, 1.0)
+        summaries = []
+        for key, (started, seen, first) in list(self.counts.items()):
+            if now - started < self.window:
+                continue
+            del self.counts[key]
+            if seen > self.limit:
+                summaries.append(self._summary(first, seen - self.limit, now - started))
+        return summaries
+
+    def _summary(
+        self, first: logging.LogRecord, suppressed: int, elapsed: float
+    ) -> logging.LogRecord:
+        msg = "Suppressed %s more records for %s (status %s) in the last %ds"
+        args = (suppressed, first.path, getattr(first, "status", None), elapsed)
+        return logging.makeLogRecord(
+            {
+                "name": first.name,
+                "levelno": first.levelno,
+                "levelname": first.levelname,
+                "msg": msg,
+                "args": args,
+                "sampling_summary": True,
+            }
+        )
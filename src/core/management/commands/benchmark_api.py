@@ -0,0 +1,392 @@
+import json
+import random
+import statistics
+import time
+import uuid
+from typing import Callable, NamedTuple, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import URLResolver, get_resolver
+from ninja_jwt.tokens import AccessToken, RefreshToken
+
+from src.articles.models import Article
+from src.comments.models import Comment
+from src.users.models import User
+
+PASSWORD = "bench-password"
+
+
+class Case(NamedTuple):
+    route: str
+    method: str
+    # request number -> (path, JSON body or None, access token or None)
+    build: Callable[[int], tuple]
+    auth: bool
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def api_routes(patterns=None):
+    # Every operation Ninja serves, named after its view function.
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            names |= api_routes(pattern.url_patterns)
+            continue
+        path_view = getattr(pattern.callback, "__self__", None)
+        for operation in getattr(path_view, "operations", ()):
+            names.add(operation.view_func.__name__)
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every API endpoint in-process against the current database "
+        "(fill it with generate_fake_data first) and report throughput, "
+        "latency percentiles and SQL queries per request as JSON. Writes go to "
+        "objects the benchmark creates and removes again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Per endpoint.")
+        parser.add_argument("--warmup", type=int, default=10, help="Per endpoint.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--only", help="Run only routes whose name contains this string."
+        )
+        parser.add_argument("--output", help="Write the report to this file.")
+        parser.add_argument(
+            "--baseline",
+            help="Report from an earlier run; fail on slower or chattier routes.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p95 latency increase over the baseline (fraction).",
+        )
+
+    def handle(self, *args, **options):
+        article_ids = list(Article.objects.values_list("pk", flat=True)[:1000])
+        comment_ids = list(Comment.objects.values_list("pk", flat=True)[:1000])
+        user_ids = list(User.objects.values_list("pk", flat=True)[:1000])
+        if not (article_ids and comment_ids):
+            raise CommandError("No data to benchmark, run generate_fake_data first")
+
+        self.random = random.Random(options["seed"])
+        self.ids = {"article": article_ids, "comment": comment_ids, "user": user_ids}
+        self.hot_article = Article.objects.order_by("-comment_count").values_list(
+            "pk", flat=True
+        )[0]
+        self.pool_size = options["warmup"] + options["requests"]
+        self.tag = uuid.uuid4().hex[:8]
+        self.client = Client(HTTP_HOST="localhost")
+
+        self.setup_fixtures()
+        try:
+            cases = self.cases()
+            results = [
+                self.run(case, options["warmup"], options["requests"])
+                for case in cases
+                if not options["only"] or options["only"] in case.route
+            ]
+        finally:
+            self.cleanup()
+
+        report = {
+            "dataset": {
+                "users": User.objects.count(),
+                "articles": Article.objects.count(),
+                "comments": Comment.objects.count(),
+                "database": connection.vendor,
+            },
+            "requests_per_endpoint": options["requests"],
+            "results": results,
+            "uncovered": sorted(api_routes() - {case.route for case in cases}),
+        }
+        regressions = []
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            regressions = self.compare(baseline, results, options["tolerance"])
+            report["regressions"] = regressions
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+        if regressions:
+            raise CommandError(f"{len(regressions)} routes regressed")
+
+    def setup_fixtures(self):
+        password = make_password(PASSWORD)
+        self.user = User.objects.create(
+            username=f"bench_{self.tag}", password=password, is_staff=True
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.article = Article.objects.create(
+            title="Benchmark", content="Benchmark article", author=self.user
+        )
+        self.comment = Comment.objects.create(
+            article=self.article, author=self.user, content="Benchmark comment"
+        )
+        # Delete requests need a fresh target each; create them up front so
+        # the setup is not timed.
+        self.doomed_articles = Article.objects.bulk_create(
+            Article(title="Doomed", content="Doomed", author=self.user)
+            for _ in range(self.pool_size * 2)
+        )
+        self.doomed_comments = Comment.objects.bulk_create(
+            Comment(article=self.article, author=self.user, content="Doomed")
+            for _ in range(self.pool_size * 2)
+        )
+        self.doomed_users = User.objects.bulk_create(
+            User(username=f"bench_{self.tag}_doomed_{i}", password=password)
+            for i in range(self.pool_size * 2)
+        )
+
+    def cleanup(self):
+        # Everything created through the API belongs to these users.
+        User.objects.filter(username__startswith=f"bench_{self.tag}").delete()
+
+    def cases(self):
+        token = lambda i: self.token  # noqa: E731
+        anon = lambda i: None  # noqa: E731
+        article = lambda i: self.sample("article")  # noqa: E731
+        comment = lambda i: self.sample("comment")  # noqa: E731
+        user = lambda i: self.sample("user")  # noqa: E731
+        articles = [
+            {"title": f"Bench {n}", "content": "Benchmark body " * 50}
+            for n in range(10)
+        ]
+        comments = [
+            {"article_id": self.article.pk, "content": "Benchmark comment"}
+            for _ in range(10)
+        ]
+
+        def doomed(pool, i, sync):
+            return pool[i * 2 + (0 if sync else 1)].pk
+
+        cases = []
+        for prefix, suffix, sync in (("", "", True), ("async/", "_async", False)):
+            a = f"/api/v1/{prefix}articles/"
+            c = f"/api/v1/{prefix}comments/"
+            u = f"/api/v1/{prefix}users/"
+            reads = [
+                ("list_articles", lambda i, a=a: a),
+                ("get_article", lambda i, a=a: f"{a}{article(i)}"),
+                (
+                    "list_article_comments",
+                    lambda i, a=a: f"{a}{self.hot_article}/comments",
+                ),
+                ("list_comments", lambda i, c=c: c),
+                ("get_comment", lambda i, c=c: f"{c}{comment(i)}"),
+                ("get_user", lambda i, u=u: f"{u}{user(i)}"),
+            ]
+            for name, path in reads:
+                for auth in (anon, token):
+                    cases.append(self.case(name + suffix, "GET", path, auth=auth))
+            cases += [
+                self.case("list_users" + suffix, "GET", lambda i, u=u: u),
+                self.case(
+                    "create_article" + suffix,
+                    "POST",
+                    lambda i, a=a: a,
+                    lambda i: articles[0],
+                ),
+                self.case(
+                    "update_article" + suffix,
+                    "PUT",
+                    lambda i, a=a: f"{a}{self.article.pk}",
+                    lambda i: {"title": f"Benchmark {i}"},
+                ),
+                self.case(
+                    "delete_article" + suffix,
+                    "DELETE",
+                    lambda i, a=a, s=sync: f"{a}{doomed(self.doomed_articles, i, s)}",
+                ),
+                self.case(
+                    "create_comment" + suffix,
+                    "POST",
+                    lambda i, c=c: c,
+                    lambda i: comments[0],
+                ),
+                self.case(
+                    "update_comment" + suffix,
+                    "PUT",
+                    lambda i, c=c: f"{c}{self.comment.pk}",
+                    lambda i: {"content": f"Benchmark {i}"},
+                ),
+                self.case(
+                    "delete_comment" + suffix,
+                    "DELETE",
+                    lambda i, c=c, s=sync: f"{c}{doomed(self.doomed_comments, i, s)}",
+                ),
+                self.case(
+                    "update_user" + suffix,
+                    "PUT",
+                    lambda i, u=u: f"{u}{self.user.pk}",
+                    lambda i: {"bio": f"Benchmark {i}"},
+                ),
+                self.case(
+                    "delete_user" + suffix,
+                    "DELETE",
+                    lambda i, u=u, s=sync: f"{u}{doomed(self.doomed_users, i, s)}",
+                    auth=lambda i, s=sync: str(
+                        AccessToken.for_user(self.doomed_users[i * 2 + (not s)])
+                    ),
+                ),
+                self.case(
+                    "search_articles" + suffix,
+                    "GET",
+                    lambda i, a=a: f"{a}search?q=database",
+                    auth=anon,
+                ),
+                self.case(
+                    "bulk_create_articles" + suffix,
+                    "POST",
+                    lambda i, a=a: f"{a}bulk",
+                    lambda i: articles,
+                ),
+                self.case(
+                    "bulk_create_comments" + suffix,
+                    "POST",
+                    lambda i, c=c: f"{c}bulk",
+                    lambda i: comments,
+                ),
+            ]
+
+        cases += [
+            self.case(
+                "login",
+                "POST",
+                lambda i: "/api/v1/auth/login",
+                lambda i: {"username": self.user.username, "password": PASSWORD},
+                auth=anon,
+            ),
+            self.case(
+                "register",
+                "POST",
+                lambda i: "/api/v1/auth/register",
+                lambda i: {
+                    "username": f"bench_{self.tag}_new_{i}",
+                    "password": PASSWORD,
+                },
+                auth=anon,
+            ),
+            self.case(
+                "refresh_token",
+                "POST",
+                lambda i: "/api/v1/auth/refresh",
+                lambda i: {"refresh": str(RefreshToken.for_user(self.user))},
+                auth=anon,
+            ),
+            self.case("logout", "POST", lambda i: "/api/v1/auth/logout"),
+            self.case("metrics", "GET", lambda i: "/api/v1/metrics", auth=anon),
+            self.case("database_stats", "GET", lambda i: "/api/v1/internal/db"),
+        ]
+        return cases
+
+    def case(self, route, method, path, body=None, auth=None):
+        auth = auth or (lambda i: self.token)
+
+        def build(i):
+            return path(i), body(i) if body else None, auth(i)
+
+        return Case(route, method, build, auth(0) is not None)
+
+    def sample(self, kind):
+        return self.random.choice(self.ids[kind])
+
+    def request(self, method, path, body, token) -> int:
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        data = json.dumps(body) if body is not None else ""
+        response = self.client.generic(
+            method, path, data, content_type="application/json", **headers
+        )
+        if response.streaming:
+            # Drain streamed bodies so their queries and time are included.
+            b"".join(response.streaming_content)
+        return response.status_code
+
+    def run(self, case: Case, warmup: int, requests: int) -> dict:
+        for i in range(warmup):
+            self.request(case.method, *case.build(i))
+
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for i in range(warmup, warmup + requests):
+            path, body, token = case.build(i)
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                request_started = time.perf_counter()
+                status = self.request(case.method, path, body, token)
+                latencies.append(time.perf_counter() - request_started)
+            queries.append(counter.count)
+            if status >= 400:
+                errors += 1
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            self.stderr.write(f"{case.route}: {errors} error responses")
+        return {
+            "route": case.route,
+            "method": case.method,
+            "auth": case.auth,
+            "requests": requests,
+            "errors": errors,
+            "throughput_rps": round(requests / elapsed, 1),
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies) * 1000, 3),
+                "p50": round(percentile(latencies, 50) * 1000, 3),
+                "p95": round(percentile(latencies, 95) * 1000, 3),
+                "p99": round(percentile(latencies, 99) * 1000, 3),
+            },
+            "queries": {
+                "mean": round(statistics.fmean(queries), 2),
+                "max": max(queries),
+            },
+        }
+
+    def compare(self, baseline, results, tolerance) -> list:
+        previous = {(r["route"], r["auth"]): r for r in baseline["results"]}
+        regressions = []
+        for result in results:
+            before: Optional[dict] = previous.get((result["route"], result["auth"]))
+            if before is None:
+                continue
+            p95, was = result["latency_ms"]["p95"], before["latency_ms"]["p95"]
+            if p95 > was * (1 + tolerance):
+                regressions.append(
+                    {
+                        "route": result["route"],
+                        "auth": result["auth"],
+                        "p95": [was, p95],
+                    }
+                )
+            if result["queries"]["max"] > before["queries"]["max"]:
+                regressions.append(
+                    {
+                        "route": result["route"],
+                        "auth": result["auth"],
+                        "queries": [before["queries"]["max"], result["queries"]["max"]],
+                    }
+                )
+        return regressions
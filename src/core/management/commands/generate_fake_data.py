@@ -0,0 +1,146 @@
+import random
+import uuid
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from src.articles.models import Article
+from src.articles.services import summarize
+from src.comments.models import Comment
+from src.users.models import User
+
+WORDS = (
+    "the of and to in is that for it as with was on be by this are from at or "
+    "an have not but which one all were when we there can more has been if "
+    "will their so would about into time only new some could these two may "
+    "first then do any like my now over such our man me even most made after "
+    "also did many before must through back years where much your way well "
+    "down should because each just those people how too little state good "
+    "very make world still own see men work long get here between both life "
+    "being under never day same another know while last might us great old "
+    "year off come since against go came right used take three django python "
+    "query index cache database latency request server article comment user"
+).split()
+
+# Zipf-like weights: a few words dominate, as in real text.
+WORD_WEIGHTS = list(accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, articles and comments for load tests. "
+        "Authorship and comment counts are skewed so a few users and articles "
+        "are hot; article lengths are log-normal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--articles", type=int, default=1000)
+        parser.add_argument(
+            "--comments", type=int, default=10, help="Mean comments per article."
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password of every generated user (hashed once).",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        users = self.create_users(options["users"], options["password"])
+        # Zipf-weighted authorship: the first users write most of the content.
+        self.user_weights = list(
+            accumulate(1 / rank for rank in range(1, len(users) + 1))
+        )
+        articles = self.create_articles(options["articles"], users)
+        comments = self.create_comments(articles, users, options["comments"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {len(users)} users, {len(articles)} articles "
+                f"and {comments} comments"
+            )
+        )
+
+    def create_users(self, count, password):
+        # The run tag keeps repeated runs from colliding on usernames.
+        tag = uuid.UUID(int=self.random.getrandbits(128)).hex[:8]
+        password = make_password(password)
+        users = [
+            User(
+                username=f"fake_{tag}_{i}",
+                email=f"fake_{tag}_{i}@example.com",
+                password=password,
+                bio=self.text(self.random.randint(0, 40))[:500],
+            )
+            for i in range(count)
+        ]
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def create_articles(self, count, users):
+        created = []
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for _ in range(start, min(count, start + self.batch_size)):
+                content = self.text(self.length(mean=600, sigma=0.7, cap=20000))
+                batch.append(
+                    Article(
+                        title=self.text(self.random.randint(3, 12))[:200].title(),
+                        content=content,
+                        author=self.pick(users),
+                        **summarize(content),
+                    )
+                )
+            created.extend(Article.objects.bulk_create(batch))
+        return created
+
+    def create_comments(self, articles, users, mean):
+        # Pareto(2) - 1 has mean 1: most articles get a handful of comments,
+        # a few get hundreds.
+        counts = {
+            article.pk: min(int(mean * (self.random.paretovariate(2) - 1)), mean * 50)
+            for article in articles
+        }
+        total = 0
+        batch = []
+        for article in articles:
+            for _ in range(counts[article.pk]):
+                batch.append(
+                    Comment(
+                        article=article,
+                        author=self.pick(users),
+                        content=self.text(self.length(mean=30, sigma=0.8, cap=180))[
+                            :1000
+                        ],
+                    )
+                )
+                if len(batch) >= self.batch_size:
+                    total += self.flush(batch)
+                    batch = []
+        if batch:
+            total += self.flush(batch)
+
+        for article in articles:
+            article.comment_count = counts[article.pk]
+        Article.objects.bulk_update(
+            articles, ["comment_count"], batch_size=self.batch_size
+        )
+        return total
+
+    def flush(self, batch):
+        Comment.objects.bulk_create(batch)
+        return len(batch)
+
+    def pick(self, users):
+        return self.random.choices(users, cum_weights=self.user_weights)[0]
+
+    def length(self, mean, sigma, cap):
+        return max(1, min(cap, int(self.random.lognormvariate(0, sigma) * mean)))
+
+    def text(self, words):
+        return " ".join(self.random.choices(WORDS, cum_weights=WORD_WEIGHTS, k=words))
@@ -0,0 +1,268 @@
+import ipaddress
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+from django.http.response import HttpResponseBase
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+# With PROMETHEUS_MULTIPROC_DIR set (see the Dockerfile) every worker process
+# writes its samples to files there and the endpoint sums them on scrape.
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route.",
+    ["route", "method"],
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "Responses by route and status code.",
+    ["route", "method", "status"],
+)
+DB_QUERIES = Histogram(
+    "db_queries_per_request",
+    "SQL queries executed per request.",
+    ["route", "method"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, float("inf")),
+)
+DB_TIME = Counter(
+    "db_query_seconds_total",
+    "Time spent executing SQL.",
+    ["route", "method"],
+)
+TOKEN_CACHE = Counter(
+    "auth_token_cache_requests_total",
+    "Verified access token cache lookups by result (hit or miss).",
+    ["result"],
+)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set per request; a context variable rather than a per-connection wrapper so
+# queries made through sync_to_async (own thread, own connection) are counted.
+current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(queries: int):
+    """
+    Declare how many SQL queries a view may run per request; checked by
+    MetricsMiddleware according to settings.QUERY_BUDGET_MODE. Put it directly
+    under the route decorator.
+    """
+
+    def decorator(view_func):
+        view_func.query_budget = queries
+        return view_func
+
+    return decorator
+
+
+def route_operation(request: HttpRequest):
+    # Ninja serves every method of a path through one PathView; the operation
+    # matching the method names the route after its view function.
+    match = request.resolver_match
+    path_view = getattr(match.func, "__self__", None) if match else None
+    for operation in getattr(path_view, "operations", ()):
+        if request.method in operation.methods:
+            return operation
+    return None
+
+
+def route_name(request: HttpRequest) -> str:
+    operation = route_operation(request)
+    if operation is not None:
+        return operation.view_func.__name__
+    match = request.resolver_match
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.view_name or "unmatched"
+
+
+def check_budget(request: HttpRequest, route: str, queries: int) -> None:
+    mode = settings.QUERY_BUDGET_MODE
+    if mode == "off":
+        return
+    operation = route_operation(request)
+    budget = getattr(operation and operation.view_func, "query_budget", None)
+    if budget is None or queries <= budget:
+        return
+    message = "Query budget exceeded on %s: %s queries, budget %s"
+    if mode == "raise":
+        raise QueryBudgetExceeded(message % (route, queries, budget))
+    logger.warning(message, route, queries, budget, extra={"path": route})
+
+
+def _counted(
+    chunks: Iterator[bytes], stats: QueryStats, done: Callable[[], None]
+) -> Iterator[bytes]:
+    try:
+        while True:
+            token = current_stats.set(stats)
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                current_stats.reset(token)
+            yield chunk
+    finally:
+        done()
+
+
+async def _acounted(
+    chunks: AsyncIterator[bytes], stats: QueryStats, done: Callable[[], None]
+) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            token = current_stats.set(stats)
+            try:
+                chunk = await anext(chunks)
+            except StopAsyncIteration:
+                return
+            finally:
+                current_stats.reset(token)
+            yield chunk
+    finally:
+        done()
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # The connection may predate this module (connection_created missed).
+        install_query_recorder(connection)
+        stats = QueryStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    async def __acall__(self, request: HttpRequest):
+        stats = QueryStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    def finish(
+        self,
+        request: HttpRequest,
+        response: HttpResponseBase,
+        stats: QueryStats,
+        started: float,
+    ) -> None:
+        def observe():
+            self.observe(request, response, stats, time.perf_counter() - started)
+
+        if not response.streaming:
+            observe()
+            return
+        # A streamed body runs its queries after the view has returned; count
+        # them against this request and observe once the body has been sent.
+        content = response.streaming_content
+        if response.is_async:
+            response.streaming_content = _acounted(content, stats, observe)
+        else:
+            response.streaming_content = _counted(content, stats, observe)
+
+    def observe(
+        self,
+        request: HttpRequest,
+        response: HttpResponseBase,
+        stats: QueryStats,
+        elapsed: float,
+    ) -> None:
+        route = route_name(request)
+        method = request.method
+        REQUEST_LATENCY.labels(route, method).observe(elapsed)
+        REQUESTS.labels(route, method, str(response.status_code)).inc()
+        DB_QUERIES.labels(route, method).observe(stats.count)
+        DB_TIME.labels(route, method).inc(stats.seconds)
+        check_budget(request, route, stats.count)
+
+
+def scrape_allowed(request: HttpRequest) -> bool:
+    # Anything relayed by nginx carries X-Forwarded-For and came from outside;
+    # a scraper on the internal network talks to the app directly.
+    if "HTTP_X_FORWARDED_FOR" in request.META:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS
+    )
+
+
+def metrics_response(registry: Optional[CollectorRegistry] = None) -> HttpResponse:
+    if registry is None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    output = generate_latest(registry or REGISTRY)
+    return HttpResponse(output, content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Tuple, Type
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from ninja import Schema
+from ninja.responses import NinjaJSONEncoder
+
+Version = Tuple[str, Optional[datetime]]
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: HttpRequest) -> bool:
+    return NDJSON_CONTENT_TYPE in request.headers.get("Accept", "")
+
+
+def partial_response(data: Any, next_cursor: Optional[str] = None) -> JsonResponse:
+    # Sparse fieldsets don't satisfy the route's response schema, so they are
+    # rendered directly with the same encoder Ninja uses.
+    response = JsonResponse(data, safe=False, encoder=NinjaJSONEncoder)
+    if next_cursor:
+        response["X-Next-Cursor"] = next_cursor
+    # Sparse detail rows read their validators along with the data.
+    version = getattr(data, "version", None)
+    if version is not None:
+        set_validators(response, version)
+    return response
+
+
+def stream_response(
+    request: HttpRequest,
+    rows: Iterable[Any],
+    schema: Type[Schema],
+    chunk_size: int = 500,
+) -> StreamingHttpResponse:
+    # `rows` comes from BaseCRUD.stream(): model instances, or dicts when
+    # fields= narrowed the read. Neither the rows nor the serialized output
+    # are ever held in memory all at once.
+    lines = (
+        (
+            json.dumps(row, cls=NinjaJSONEncoder, separators=(",", ":"))
+            if isinstance(row, dict)
+            else schema.from_orm(row).model_dump_json()
+        )
+        for row in rows
+    )
+    if wants_ndjson(request):
+        body = _ndjson_lines(lines, chunk_size)
+        content_type = NDJSON_CONTENT_TYPE
+    else:
+        body = _json_array(lines, chunk_size)
+        content_type = "application/json"
+    if isinstance(request, ASGIRequest):
+        body = _aiterate(body)
+    return StreamingHttpResponse(body, content_type=content_type)
+
+
+async def _aiterate(chunks: Iterator[str]) -> AsyncIterator[str]:
+    # Under ASGI Django reads a sync iterator to the end before sending any of
+    # it; pull one chunk at a time on the thread the sync ORM calls share.
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def _ndjson_lines(rows: Iterable[str], chunk_size: int) -> Iterator[str]:
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _json_array(rows: Iterable[str], chunk_size: int) -> Iterator[str]:
+    yield "["
+    buffer = []
+    separator = ""
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            yield separator + ",".join(buffer)
+            separator = ","
+            buffer = []
+    if buffer:
+        yield separator + ",".join(buffer)
+    yield "]"
+
+
+def is_conditional(request: HttpRequest) -> bool:
+    return "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+
+
+def not_modified(request: HttpRequest, version: Version) -> Optional[HttpResponse]:
+    etag, last_modified = version
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, version)
+    return response
+
+
+def set_validators(response: HttpResponseBase, version: Version) -> None:
+    etag, last_modified = version
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+
+def _stamp(result: Any, response: HttpResponse, version: Version) -> Any:
+    # Sparse, streamed and 304 bodies are returned as ready responses; schema
+    # output is rendered later by Ninja from the temporal `response`.
+    set_validators(
+        result if isinstance(result, HttpResponseBase) else response, version
+    )
+    return result
+
+
+def _has_validators(result: Any) -> bool:
+    return isinstance(result, HttpResponseBase) and result.has_header("ETag")
+
+
+def conditional_detail(crud, pk_arg: str):
+    """
+    Answer If-None-Match/If-Modified-Since for a detail view from a probe of the
+    row's version, and put ETag/Last-Modified on what the view returns. The view
+    must take a `response: HttpResponse` argument.
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                pk = kwargs[pk_arg]
+                version = None
+                if is_conditional(request):
+                    version = await crud.aversion(pk)
+                    cached = not_modified(request, version)
+                    if cached is not None:
+                        return cached
+                result = await view(request, *args, **kwargs)
+                if _has_validators(result):
+                    return result
+                version = version or crud.version_of(pk, result)
+                version = version or await crud.aversion(pk)
+                return _stamp(result, kwargs["response"], version)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            pk = kwargs[pk_arg]
+            version = None
+            if is_conditional(request):
+                version = crud.version(pk)
+                cached = not_modified(request, version)
+                if cached is not None:
+                    return cached
+            result = view(request, *args, **kwargs)
+            if _has_validators(result):
+                return result
+            version = version or crud.version_of(pk, result) or crud.version(pk)
+            return _stamp(result, kwargs["response"], version)
+
+        return wrapper
+
+    return decorator
+
+
+def conditional_list(crud):
+    """
+    Version a list page by what it returns rather than by the whole table:
+    its rows' versions (or, for sparse pages, the rendered body), the next
+    cursor and the query string, which carries cursor, limit, fields and
+    view. Answers If-None-Match with a 304 after the page is read; streams
+    are sent without validators. The view must take a `response: HttpResponse`
+    argument.
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                result = await view(request, *args, **kwargs)
+                return _conditional_page(request, crud, result, kwargs["response"])
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            result = view(request, *args, **kwargs)
+            return _conditional_page(request, crud, result, kwargs["response"])
+
+        return wrapper
+
+    return decorator
+
+
+def _conditional_page(
+    request: HttpRequest, crud, result: Any, response: HttpResponse
+) -> Any:
+    if isinstance(result, StreamingHttpResponse):
+        return result
+    if isinstance(result, HttpResponseBase):
+        parts = [result.content]
+        next_cursor = result.get("X-Next-Cursor", "")
+    else:
+        # Rows are loaded with every relation their etag_fields reach.
+        parts = [crud.version_of(item.pk, item)[0].encode() for item in result]
+        next_cursor = response.get("X-Next-Cursor", "")
+    parts += [next_cursor.encode(), request.get_full_path().encode()]
+    digest = hashlib.sha256(b"\n".join(parts)).hexdigest()[:32]
+    version = (f'"{digest}"', None)
+    cached = not_modified(request, version)
+    if cached is not None:
+        return cached
+    return _stamp(result, response, version)
@@ -0,0 +1,137 @@
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from ninja import Router
+
+from .auth import async_jwt_auth, jwt_auth
+from .hashing import amake_password
+from .metrics import query_budget
+
+# True while the body of an async registration runs.
+_asynchronous: ContextVar[bool] = ContextVar("asynchronous_route", default=False)
+
+# Async counterparts of plain functions; CRUD methods pair up by name
+# (ArticleCRUD.list -> ArticleCRUD.alist).
+ASYNC_VARIANTS: Dict[Callable, Callable] = {
+    get_object_or_404: aget_object_or_404,
+    make_password: amake_password,
+}
+
+
+class _Done:
+    # Already-computed result a sync route body can `await` without a loop.
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __await__(self):
+        return self.value
+        yield
+
+
+def call(fn: Callable, *args, **kwargs):
+    """
+    Run a database or other blocking call from a DualRouter route body:
+    inline on the sync registration; on the async one through its native
+    async variant when it has one, else via sync_to_async.
+    """
+    if not _asynchronous.get():
+        return _Done(fn(*args, **kwargs))
+    variant = ASYNC_VARIANTS.get(fn)
+    owner = getattr(fn, "__self__", None)
+    if variant is None and owner is not None:
+        variant = getattr(owner, f"a{fn.__name__}", None)
+    return (variant or sync_to_async(fn))(*args, **kwargs)
+
+
+def _run(coroutine):
+    # Drive a sync route body; every await in it is a _Done, so it finishes
+    # on the first step.
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError(f"{coroutine.__qualname__} awaited outside call()")
+
+
+def _bind(body: Callable, asynchronous: bool) -> Callable:
+    if asynchronous:
+
+        @wraps(body)
+        async def view(*args, **kwargs):
+            token = _asynchronous.set(True)
+            try:
+                return await body(*args, **kwargs)
+            finally:
+                _asynchronous.reset(token)
+
+        view.__name__ = view.__qualname__ = f"{body.__name__}_async"
+        return view
+
+    @wraps(body)
+    def view(*args, **kwargs):
+        token = _asynchronous.set(False)
+        try:
+            return _run(body(*args, **kwargs))
+        finally:
+            _asynchronous.reset(token)
+
+    return view
+
+
+class DualRouter:
+    """
+    Registers every route twice from one definition: as a sync view on
+    `sync` and as `<name>_async` on `asynchronous`, with the same parameters,
+    query budget and decorators. Route bodies are `async def` and reach the
+    database only through `await call(...)`.
+    """
+
+    def __init__(self, tag: str):
+        self.sync = Router(tags=[tag])
+        self.asynchronous = Router(tags=[f"{tag} (async)"])
+
+    def api_operation(
+        self,
+        method: str,
+        path: str,
+        *,
+        budget: int,
+        auth: bool = False,
+        decorators: Iterable[Callable] = (),
+        **kwargs,
+    ):
+        decorators = list(decorators)
+
+        def register(body: Callable) -> Callable:
+            for router, asynchronous in (
+                (self.sync, False),
+                (self.asynchronous, True),
+            ):
+                view = _bind(body, asynchronous)
+                for decorator in reversed(decorators):
+                    view = decorator(view)
+                if auth:
+                    kwargs["auth"] = async_jwt_auth if asynchronous else jwt_auth
+                router.api_operation([method], path, **kwargs)(
+                    query_budget(budget)(view)
+                )
+            return body
+
+        return register
+
+    def get(self, path: str, **kwargs):
+        return self.api_operation("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs):
+        return self.api_operation("POST", path, **kwargs)
+
+    def put(self, path: str, **kwargs):
+        return self.api_operation("PUT", path, **kwargs)
+
+    def delete(self, path: str, **kwargs):
+        return self.api_operation("DELETE", path, **kwargs)
@@ -1,6 +1,15 @@
+from typing import Dict, List, Optional
+
 from ninja import Schema
 
 
 class RegisterSuccessSchema(Schema):
     success: bool
     message: str
+
+
+class BulkResultSchema(Schema):
+    index: int
+    success: bool
+    id: Optional[int] = None
+    errors: Optional[Dict[str, List[str]]] = None
@@ -1,17 +1,67 @@
+import asyncio
+import base64
+import binascii
+import json
 import logging
-from typing import Any, Dict, Iterable, Type, TypeVar
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
 
-from django.core.exceptions import PermissionDenied
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import (
+    NON_FIELD_ERRORS,
+    FieldDoesNotExist,
+    PermissionDenied,
+    ValidationError,
+)
+from django.db import models, transaction
+from django.db.models import Q, QuerySet
 from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from django.utils.module_loading import import_string
+from ninja import Schema
+from ninja.errors import HttpError
+from pydantic import ValidationError as PydanticValidationError
+
+from .db import replica_reads
 
 M = TypeVar("M", bound=models.Model)
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
 logger = logging.getLogger("src.core.services")
 
 
+class VersionedData(dict):
+    """A sparse (fields=) detail row that carries the ETag validators read
+    along with it, so no second query is needed to version it."""
+
+    def __init__(self, data: Dict[str, Any], version: Tuple[str, Optional[datetime]]):
+        super().__init__(data)
+        self.version = version
+
+
 class BaseCRUD:
     model: Type[M] = None
+    out_schema: Type[Schema] = None
+    page_size: int = 20
+    max_page_size: int = 100
+    cursor_fields: Tuple[str, ...] = ("created_at", "id")
+    # (dotted CRUD path, FK field) pairs whose cached output embeds this model.
+    cache_dependents: Tuple[Tuple[str, str], ...] = ()
+    cache_lock_timeout: int = 5
+    # out_schema fields computed by resolvers, mapped to the ORM lookup backing them.
+    field_lookups: Dict[str, str] = {}
+    # FK column matched against the acting user's id on update and delete.
+    owner_field: Optional[str] = None
+    # Columns whose change must change a row's ETag, including those of rows
+    # embedded in out_schema ("author__updated_at"); the newest datetime among
+    # them gives the Last-Modified date.
+    etag_fields: Tuple[str, ...] = ("updated_at",)
 
     @classmethod
     def get_queryset(cls):
@@ -22,19 +72,501 @@ class BaseCRUD:
         try:
             return cls.get_queryset().get(pk=pk)
         except cls.model.DoesNotExist:
-            logger.warning(f"{cls.model.__name__} with ID={pk} not found.")
-            raise Http404(f"{cls.model.__name__} not found")
+            cls._not_found(pk)
 
     @classmethod
-    def list(cls) -> Iterable[M]:
-        logger.info(f"Listing {cls.model.__name__}")
-        return cls.get_queryset()
+    def _not_found(cls, pk: int):
+        logger.warning("%s with ID=%s not found.", cls.model.__name__, pk)
+        raise Http404(f"{cls.model.__name__} not found")
 
     @classmethod
-    def retrieve(cls, pk: int) -> M:
-        instance = cls.get_object(pk)
-        logger.info(f"Retrieved {cls.model.__name__} ID={pk}")
-        return instance
+    async def aget_object(cls, pk: int) -> M:
+        try:
+            return await cls.get_queryset().aget(pk=pk)
+        except cls.model.DoesNotExist:
+            cls._not_found(pk)
+
+    @classmethod
+    def list(
+        cls,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
+        **filters,
+    ) -> Tuple[List[Any], Optional[str]]:
+        logger.info("Listing %s", cls.model.__name__)
+        queryset = cls.get_queryset().filter(**filters)
+        with replica_reads():
+            if not fields:
+                return cls.paginate(queryset, cursor, limit)
+
+            lookups = cls._field_lookups(cls._parse_fields(fields))
+            rows, next_cursor = cls.paginate(
+                cls._values(queryset, lookups), cursor, limit
+            )
+        return [cls._shape(row, lookups) for row in rows], next_cursor
+
+    @classmethod
+    async def alist(
+        cls,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
+        **filters,
+    ) -> Tuple[List[Any], Optional[str]]:
+        logger.info("Listing %s", cls.model.__name__)
+        queryset = cls.get_queryset().filter(**filters)
+        with replica_reads():
+            if not fields:
+                return await cls.apaginate(queryset, cursor, limit)
+
+            lookups = cls._field_lookups(cls._parse_fields(fields))
+            rows, next_cursor = await cls.apaginate(
+                cls._values(queryset, lookups), cursor, limit
+            )
+        return [cls._shape(row, lookups) for row in rows], next_cursor
+
+    @classmethod
+    def stream(
+        cls,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        chunk_size: int = 500,
+        **filters,
+    ) -> Iterator[Any]:
+        # Rows are read while the response body is sent, after the view has
+        # returned, so the cursor is checked and the read alias picked now.
+        logger.info("Streaming %s", cls.model.__name__)
+        queryset = cls.get_queryset().filter(**filters)
+        lookups = cls._field_lookups(cls._parse_fields(fields)) if fields else None
+        if lookups:
+            queryset = cls._values(queryset, lookups)
+        queryset = cls._page_queryset(queryset, cursor, None, cls.cursor_fields)[0]
+        with replica_reads():
+            queryset = queryset.using(queryset.db)
+        rows = queryset.iterator(chunk_size=chunk_size)
+        if lookups:
+            return (cls._shape(row, lookups) for row in rows)
+        return rows
+
+    @classmethod
+    def paginate(
+        cls,
+        queryset: QuerySet,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        keys: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[M], Optional[str]]:
+        # Keyset pagination, newest first on `keys` (cursor_fields by default).
+        keys = keys or cls.cursor_fields
+        queryset, limit = cls._page_queryset(queryset, cursor, limit, keys)
+        return cls._page_result(list(queryset[: limit + 1]), limit, keys)
+
+    @classmethod
+    async def apaginate(
+        cls,
+        queryset: QuerySet,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        keys: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[M], Optional[str]]:
+        keys = keys or cls.cursor_fields
+        queryset, limit = cls._page_queryset(queryset, cursor, limit, keys)
+        items = [obj async for obj in queryset[: limit + 1]]
+        return cls._page_result(items, limit, keys)
+
+    @classmethod
+    def _page_queryset(
+        cls,
+        queryset: QuerySet,
+        cursor: Optional[str],
+        limit: Optional[int],
+        keys: Tuple[str, ...],
+    ) -> Tuple[QuerySet, int]:
+        limit = max(1, min(limit or cls.page_size, cls.max_page_size))
+        queryset = queryset.order_by(*(f"-{f}" for f in keys))
+        if cursor:
+            values = cls._decode_cursor(cursor, keys)
+            queryset = queryset.filter(cls._cursor_filter(values, keys))
+        return queryset, limit
+
+    @classmethod
+    def _page_result(
+        cls, items: List[M], limit: int, keys: Tuple[str, ...]
+    ) -> Tuple[List[M], Optional[str]]:
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = cls._encode_cursor(items[-1], keys)
+        return items, next_cursor
+
+    @classmethod
+    def _cursor_filter(cls, values: List[Any], keys: Tuple[str, ...]) -> Q:
+        condition = Q()
+        for i, field in enumerate(keys):
+            exact = {f: v for f, v in zip(keys[:i], values[:i])}
+            condition |= Q(**exact, **{f"{field}__lt": values[i]})
+        return condition
+
+    @classmethod
+    def _encode_cursor(cls, instance: Any, keys: Tuple[str, ...]) -> str:
+        values = []
+        for field in keys:
+            if isinstance(instance, dict):
+                value = instance[field]
+            else:
+                value = getattr(instance, field)
+            values.append(value.isoformat() if isinstance(value, datetime) else value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def _decode_cursor(cls, cursor: str, keys: Tuple[str, ...]) -> List[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError):
+            raise HttpError(400, "Invalid cursor")
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise HttpError(400, "Invalid cursor")
+
+        decoded = []
+        for field, value in zip(keys, values):
+            try:
+                model_field = cls.model._meta.get_field(field)
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is not None:
+                try:
+                    value = model_field.to_python(value)
+                except (ValidationError, ValueError, TypeError):
+                    raise HttpError(400, "Invalid cursor")
+            elif isinstance(value, bool) or not isinstance(value, (int, float)):
+                # Annotations such as a search rank are always numeric.
+                raise HttpError(400, "Invalid cursor")
+            if value is None:
+                raise HttpError(400, "Invalid cursor")
+            decoded.append(value)
+        return decoded
+
+    @classmethod
+    def retrieve(cls, pk: int, fields: Optional[str] = None) -> Any:
+        # Cache misses are filled from the primary so replication lag never
+        # ends up in the shared cache; uncached reads may use the replica.
+        selected = cls._parse_fields(fields) if fields else None
+        if cls._cache_enabled():
+            key = cls._cache_key(pk)
+            data = cache.get(key)
+            if data is None:
+                data = cls._fill_cache(pk, key)
+            if selected:
+                data = cls._select_cached(pk, data, selected)
+        elif selected:
+            lookups = cls._field_lookups(selected)
+            queryset = cls.get_queryset().filter(pk=pk)
+            with replica_reads():
+                row = cls._values(queryset, lookups, cls.etag_fields).first()
+            data = cls._versioned_row(pk, row, lookups)
+        else:
+            with replica_reads():
+                data = cls.get_object(pk)
+        logger.info("Retrieved %s ID=%s", cls.model.__name__, pk)
+        return data
+
+    @classmethod
+    async def aretrieve(cls, pk: int, fields: Optional[str] = None) -> Any:
+        selected = cls._parse_fields(fields) if fields else None
+        if cls._cache_enabled():
+            key = cls._cache_key(pk)
+            data = await cache.aget(key)
+            if data is None:
+                data = await cls._afill_cache(pk, key)
+            if selected:
+                data = cls._select_cached(pk, data, selected)
+        elif selected:
+            lookups = cls._field_lookups(selected)
+            queryset = cls.get_queryset().filter(pk=pk)
+            with replica_reads():
+                row = await cls._values(queryset, lookups, cls.etag_fields).afirst()
+            data = cls._versioned_row(pk, row, lookups)
+        else:
+            with replica_reads():
+                data = await cls.aget_object(pk)
+        logger.info("Retrieved %s ID=%s", cls.model.__name__, pk)
+        return data
+
+    @classmethod
+    def _select_cached(
+        cls, pk: int, data: Dict[str, Any], selected: Dict[str, Optional[List[str]]]
+    ) -> Dict[str, Any]:
+        version = cls.version_of(pk, data)
+        data = cls._project(data, selected)
+        return data if version is None else VersionedData(data, version)
+
+    @classmethod
+    def _versioned_row(
+        cls, pk: int, row: Optional[Dict[str, Any]], lookups: Dict[str, Any]
+    ) -> VersionedData:
+        if row is None:
+            cls._not_found(pk)
+        version = cls._version([pk, *(row[f] for f in cls.etag_fields)])
+        return VersionedData(cls._shape(row, lookups), version)
+
+    @classmethod
+    def version(cls, pk: int) -> Tuple[str, Optional[datetime]]:
+        # Primary-key lookup on the bare table: no joins, no serialization.
+        # Read from where retrieve() reads, so validators match the body.
+        with replica_reads():
+            row = cls.model.objects.filter(pk=pk).values_list(*cls.etag_fields).first()
+        if row is None:
+            cls._not_found(pk)
+        return cls._version([pk, *row])
+
+    @classmethod
+    async def aversion(cls, pk: int) -> Tuple[str, Optional[datetime]]:
+        queryset = cls.model.objects.filter(pk=pk).values_list(*cls.etag_fields)
+        with replica_reads():
+            row = await queryset.afirst()
+        if row is None:
+            cls._not_found(pk)
+        return cls._version([pk, *row])
+
+    @classmethod
+    def version_of(cls, pk: int, data: Any) -> Optional[Tuple[str, Optional[datetime]]]:
+        # Same validators as version(), from an already loaded object or its
+        # cached serialization; None when sparse fields left a column out.
+        if isinstance(data, VersionedData):
+            return data.version
+        values = []
+        for field in cls.etag_fields:
+            value = cls._path_value(data, field)
+            if value is None:
+                return None
+            if isinstance(value, str):
+                value = parse_datetime(value) or value
+            values.append(value)
+        return cls._version([pk, *values])
+
+    @staticmethod
+    def _path_value(data: Any, lookup: str) -> Any:
+        # Follows "author__updated_at" through loaded relations or nested dicts.
+        for name in lookup.split("__"):
+            if data is None:
+                return None
+            data = (
+                data.get(name) if isinstance(data, dict) else getattr(data, name, None)
+            )
+        return data
+
+    @classmethod
+    def _version(cls, values: Iterable[Any]) -> Tuple[str, Optional[datetime]]:
+        tokens = []
+        last_modified = None
+        for value in values:
+            if isinstance(value, datetime):
+                last_modified = max(last_modified or value, value)
+                value = (value - EPOCH) // MICROSECOND
+            tokens.append(str(value or 0))
+        return '"' + "-".join(tokens) + '"', last_modified
+
+    @classmethod
+    def _matched_versions(cls, pk: int, if_match: str) -> Optional[List[datetime]]:
+        # The updated_at of each If-Match ETag for this row; None for "*".
+        # Writes only conflict with writes, so the other etag_fields (counters,
+        # embedded rows) are left out and a new comment does not fail an edit.
+        position = cls.etag_fields.index("updated_at") + 1
+        versions = []
+        for etag in parse_etags(if_match):
+            if etag == "*":
+                return None
+            tokens = etag.strip('"').split("-")
+            if tokens[0] != str(pk) or len(tokens) != len(cls.etag_fields) + 1:
+                continue
+            try:
+                versions.append(EPOCH + int(tokens[position]) * MICROSECOND)
+            except ValueError:
+                continue
+        return versions
+
+    @classmethod
+    def _etag_conditions(cls, pk: int, if_match: str) -> Optional[Q]:
+        # Lets a write require an If-Match version in its WHERE clause.
+        versions = cls._matched_versions(pk, if_match)
+        return None if versions is None else Q(updated_at__in=versions)
+
+    @classmethod
+    def _precondition_failed(cls, pk: int):
+        logger.info(
+            "%s ID=%s changed since the If-Match version.", cls.model.__name__, pk
+        )
+        raise HttpError(412, f"{cls.model.__name__} has been modified")
+
+    @classmethod
+    def _parse_fields(cls, fields: str) -> Dict[str, Optional[List[str]]]:
+        # "id,title,author.username" -> {"id": None, "title": None,
+        # "author": ["username"]}; None selects every (nested) field.
+        selected = {}
+        for item in filter(None, (f.strip() for f in fields.split(","))):
+            name, _, sub = item.partition(".")
+            if name not in cls.out_schema.model_fields:
+                raise HttpError(400, f"Unknown field '{item}'")
+            nested = cls._nested_schema(name)
+            if sub and (nested is None or sub not in nested.model_fields):
+                raise HttpError(400, f"Unknown field '{item}'")
+
+            if not sub:
+                selected[name] = None
+            elif selected.get(name, []) is not None:
+                selected.setdefault(name, []).append(sub)
+        if not selected:
+            raise HttpError(400, "No fields selected")
+        return selected
+
+    @classmethod
+    def _nested_schema(cls, name: str) -> Optional[Type[Schema]]:
+        annotation = cls.out_schema.model_fields[name].annotation
+        if isinstance(annotation, type) and issubclass(annotation, Schema):
+            return annotation
+        return None
+
+    @classmethod
+    def _field_lookups(cls, selected: Dict[str, Optional[List[str]]]) -> Dict[str, Any]:
+        lookups = {}
+        for name, subfields in selected.items():
+            nested = cls._nested_schema(name)
+            if nested is None:
+                lookups[name] = cls.field_lookups.get(name, name)
+            else:
+                lookups[name] = {
+                    sub: f"{name}__{sub}" for sub in subfields or nested.model_fields
+                }
+        return lookups
+
+    @classmethod
+    def _values(
+        cls, queryset: QuerySet, lookups: Dict[str, Any], extra: Iterable[str] = ()
+    ) -> QuerySet:
+        # values() drops select_related, so only the joins the requested
+        # lookups need are made and only their columns are read; `extra`
+        # columns are read too but left out by _shape().
+        columns = {*cls.cursor_fields, *extra}
+        for lookup in lookups.values():
+            columns.update(lookup.values() if isinstance(lookup, dict) else [lookup])
+        return queryset.values(*columns)
+
+    @classmethod
+    def _shape(cls, row: Dict[str, Any], lookups: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            name: (
+                {sub: row[column] for sub, column in lookup.items()}
+                if isinstance(lookup, dict)
+                else row[lookup]
+            )
+            for name, lookup in lookups.items()
+        }
+
+    @classmethod
+    def _project(
+        cls, data: Dict[str, Any], selected: Dict[str, Optional[List[str]]]
+    ) -> Dict[str, Any]:
+        return {
+            name: (
+                data[name]
+                if subfields is None
+                else {sub: data[name][sub] for sub in subfields}
+            )
+            for name, subfields in selected.items()
+        }
+
+    @classmethod
+    def _cache_enabled(cls) -> bool:
+        return cls.out_schema is not None and settings.CRUD_CACHE_TIMEOUT > 0
+
+    @classmethod
+    def _cache_key(cls, pk: int) -> str:
+        return f"crud:{cls.model._meta.label_lower}:{pk}"
+
+    @classmethod
+    def _serialize(cls, instance: M) -> Dict[str, Any]:
+        return cls.out_schema.from_orm(instance).dict()
+
+    @classmethod
+    def _fill_cache(cls, pk: int, key: str) -> Dict[str, Any]:
+        lock_key = f"{key}:lock"
+        if cache.add(lock_key, 1, cls.cache_lock_timeout):
+            try:
+                data = cls._load_serialized(pk)
+                cache.set(key, data, settings.CRUD_CACHE_TIMEOUT)
+                return data
+            finally:
+                cache.delete(lock_key)
+
+        # Another worker is already loading this key: wait for its result
+        # instead of sending the same query to the database.
+        deadline = time.monotonic() + cls.cache_lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            data = cache.get(key)
+            if data is not None:
+                return data
+            if cache.get(lock_key) is None:
+                break
+        return cls._load_serialized(pk)
+
+    @classmethod
+    async def _afill_cache(cls, pk: int, key: str) -> Dict[str, Any]:
+        # Same as _fill_cache, but waits on the event loop: sleeping inside
+        # sync_to_async would hold the thread all async ORM calls share.
+        lock_key = f"{key}:lock"
+        if await cache.aadd(lock_key, 1, cls.cache_lock_timeout):
+            try:
+                data = await sync_to_async(cls._load_serialized)(pk)
+                await cache.aset(key, data, settings.CRUD_CACHE_TIMEOUT)
+                return data
+            finally:
+                await cache.adelete(lock_key)
+
+        deadline = time.monotonic() + cls.cache_lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+            data = await cache.aget(key)
+            if data is not None:
+                return data
+            if await cache.aget(lock_key) is None:
+                break
+        return await sync_to_async(cls._load_serialized)(pk)
+
+    @classmethod
+    def _load_serialized(cls, pk: int) -> Dict[str, Any]:
+        return cls._serialize(cls.get_object(pk))
+
+    @classmethod
+    def invalidate_cache(cls, pks: Iterable[int], cascade: bool = False) -> None:
+        if not cls._cache_enabled():
+            return
+        pks = list(pks)
+        if not pks:
+            return
+
+        keys = [cls._cache_key(pk) for pk in pks]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+        for path, field in cls.cache_dependents:
+            dependent = import_string(path)
+            dependent_pks = dependent.model.objects.filter(
+                **{f"{field}__in": pks}
+            ).values_list("pk", flat=True)
+            if cascade:
+                dependent.invalidate_cache(dependent_pks, cascade=True)
+            else:
+                dependent.drop_cached(dependent_pks)
+
+    @classmethod
+    def drop_cached(cls, pks: Iterable[int]) -> None:
+        if not cls._cache_enabled():
+            return
+        keys = [cls._cache_key(pk) for pk in pks]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
 
     @classmethod
     def _allowed_fields(cls) -> set:
@@ -63,34 +595,317 @@ class BaseCRUD:
         filtered = {k: v for k, v in data.items() if k in allowed}
         instance = cls.model(**filtered)
         instance.full_clean()
-        instance.save()
+        cls._save_new(instance)
         logger.info(
-            f"Created {cls.model.__name__} ID={instance.pk} by user ID={data.get('author_id')}"
+            "Created %s ID=%s by user ID=%s",
+            cls.model.__name__,
+            instance.pk,
+            data.get("author_id"),
         )
         return instance
 
     @classmethod
-    def update(cls, pk: int, data: Dict[str, Any], user_id: int = None) -> M:
-        instance = cls.get_object(pk)
+    async def acreate(cls, data: Dict[str, Any]) -> M:
         allowed = cls._allowed_fields()
-        for key, value in data.items():
-            if key in allowed:
-                setattr(instance, key, value)
-        instance.full_clean()
-        instance.save()
-        safe_data = cls._mask_sensitive_data(data)
+        filtered = {k: v for k, v in data.items() if k in allowed}
+        instance = cls.model(**filtered)
+        await sync_to_async(instance.full_clean)()
+        await sync_to_async(cls._save_new)(instance)
         logger.info(
-            f"Updated {cls.model.__name__} ID={pk}. Changed: {safe_data}. By user ID={user_id or pk}"
+            "Created %s ID=%s by user ID=%s",
+            cls.model.__name__,
+            instance.pk,
+            data.get("author_id"),
         )
         return instance
 
     @classmethod
-    def delete(cls, pk: int, user_id: int = None) -> None:
+    def _save_new(cls, instance: M) -> None:
+        with transaction.atomic():
+            instance.save()
+            cls.after_create(instance)
+
+    @classmethod
+    def after_create(cls, instance: M) -> None:
+        """Hook run in the creating transaction, e.g. to maintain counters."""
+
+    @classmethod
+    def bulk_create(
+        cls,
+        items: List[Any],
+        batch_size: Optional[int] = None,
+        **defaults,
+    ) -> List[Dict[str, Any]]:
+        # Items arrive unvalidated so one malformed item is reported in its
+        # own result instead of failing the whole batch with a 422.
+        if len(items) > settings.BULK_CREATE_MAX_ITEMS:
+            raise HttpError(
+                400, f"At most {settings.BULK_CREATE_MAX_ITEMS} items per request"
+            )
+
+        allowed = cls._allowed_fields()
+        # Relations are resolved by the caller (see bulk_errors), not per row.
+        relations = [f.name for f in cls.model._meta.fields if f.is_relation]
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            errors = None
+            if not isinstance(item, dict):
+                # Ninja schemas also read attributes, so "abc" has a .title.
+                errors = {NON_FIELD_ERRORS: ["Expected an object"]}
+            else:
+                try:
+                    data = cls.create_schema.model_validate(item).dict()
+                except PydanticValidationError as e:
+                    errors = cls._schema_errors(e)
+            if errors is not None:
+                results[index] = {"index": index, "success": False, "errors": errors}
+                continue
+            valid[index] = cls.bulk_data({**data, **defaults})
+        for index, error in cls.bulk_errors(valid).items():
+            results[index] = {"index": index, "success": False, "errors": error}
+
+        pending = []
+        for index, data in valid.items():
+            if results[index] is not None:
+                continue
+            instance = cls.model(**{k: v for k, v in data.items() if k in allowed})
+            try:
+                instance.full_clean(exclude=relations)
+            except ValidationError as e:
+                results[index] = {
+                    "index": index,
+                    "success": False,
+                    "errors": e.message_dict,
+                }
+                continue
+            pending.append((index, instance))
+
+        instances = [instance for _, instance in pending]
+        if instances:
+            with transaction.atomic():
+                cls.model.objects.bulk_create(
+                    instances, batch_size=batch_size or settings.BULK_CREATE_BATCH_SIZE
+                )
+                cls.after_bulk_create(instances)
+        for index, instance in pending:
+            results[index] = {"index": index, "success": True, "id": instance.pk}
+        logger.info(
+            "Bulk created %s of %s %s rows",
+            len(instances),
+            len(items),
+            cls.model.__name__,
+        )
+        return results
+
+    @classmethod
+    def _schema_errors(cls, error: PydanticValidationError) -> Dict[str, List[str]]:
+        # Same shape as ValidationError.message_dict.
+        errors = {}
+        for detail in error.errors():
+            field = ".".join(str(part) for part in detail["loc"]) or NON_FIELD_ERRORS
+            errors.setdefault(field, []).append(detail["msg"])
+        return errors
+
+    @classmethod
+    def bulk_data(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-item hook on schema-valid data, before the row is built."""
+        return data
+
+    @classmethod
+    def bulk_errors(
+        cls, items: Dict[int, Dict[str, Any]]
+    ) -> Dict[int, Dict[str, List[str]]]:
+        """Batch-level checks on the schema-valid items, keyed by item index."""
+        return {}
+
+    @classmethod
+    def after_bulk_create(cls, instances: List[M]) -> None:
+        for instance in instances:
+            cls.after_create(instance)
+
+    @classmethod
+    def _apply_changes(cls, instance: M, data: Dict[str, Any]) -> Dict[str, Any]:
+        allowed = cls._allowed_fields()
+        changes = {
+            key: value
+            for key, value in data.items()
+            if key in allowed and getattr(instance, key) != value
+        }
+        for key, value in changes.items():
+            setattr(instance, key, value)
+        # Stored columns were valid when written; only the changed ones are
+        # checked, which also skips FK existence queries for untouched relations.
+        instance.full_clean(
+            exclude=[
+                f.name
+                for f in cls.model._meta.fields
+                if f.name not in changes and f.attname not in changes
+            ]
+        )
+        return changes
+
+    @classmethod
+    def _expected_version(
+        cls, instance: M, if_match: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        if if_match is None:
+            return None
+        versions = cls._matched_versions(instance.pk, if_match)
+        if versions is None:
+            return None
+        if instance.updated_at not in versions:
+            cls._precondition_failed(instance.pk)
+        return {"updated_at": instance.updated_at}
+
+    @classmethod
+    def _save_changes(
+        cls,
+        instance: M,
+        changes: Dict[str, Any],
+        expected: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if not changes:
+            return
+        auto_now = [
+            f.name for f in cls.model._meta.fields if getattr(f, "auto_now", False)
+        ]
+        with transaction.atomic():
+            if expected is None:
+                instance.save(update_fields=[*changes, *auto_now])
+            else:
+                cls._conditional_save(instance, [*changes, *auto_now], expected)
+            cls.after_update(instance, changes)
+            cls.invalidate_cache([instance.pk])
+
+    @classmethod
+    def _conditional_save(
+        cls, instance: M, update_fields: List[str], expected: Dict[str, Any]
+    ) -> None:
+        # save() can't add terms to its WHERE clause, so the version read with
+        # the object is re-checked by the UPDATE itself to catch racing writes.
+        values = {}
+        for name in update_fields:
+            field = cls.model._meta.get_field(name)
+            values[field.attname] = field.pre_save(instance, False)
+        queryset = cls.model.objects.filter(pk=instance.pk, **expected)
+        if not queryset.update(**values):
+            cls._precondition_failed(instance.pk)
+
+    @classmethod
+    def after_update(cls, instance: M, changes: Dict[str, Any]) -> None:
+        """Hook run in the updating transaction with the fields that changed."""
+
+    @classmethod
+    def before_delete(cls, queryset: QuerySet) -> Any:
+        """Hook run in the deleting transaction with the rows about to go."""
+
+    @classmethod
+    def after_delete(cls, state: Any) -> None:
+        """Hook run in the deleting transaction once rows actually went, with
+        what before_delete returned."""
+
+    @classmethod
+    def update(
+        cls,
+        pk: int,
+        data: Dict[str, Any],
+        user_id: int = None,
+        if_match: Optional[str] = None,
+    ) -> M:
         instance = cls.get_object(pk)
+        cls._check_owner(instance, user_id)
+        expected = cls._expected_version(instance, if_match)
+        changes = cls._apply_changes(instance, data)
+        cls._save_changes(instance, changes, expected)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Updated %s ID=%s. Changed: %s. By user ID=%s",
+                cls.model.__name__,
+                pk,
+                cls._mask_sensitive_data(data),
+                user_id or pk,
+            )
+        return instance
+
+    @classmethod
+    async def aupdate(
+        cls,
+        pk: int,
+        data: Dict[str, Any],
+        user_id: int = None,
+        if_match: Optional[str] = None,
+    ) -> M:
+        instance = await cls.aget_object(pk)
+        cls._check_owner(instance, user_id)
+        expected = cls._expected_version(instance, if_match)
+        changes = await sync_to_async(cls._apply_changes)(instance, data)
+        await sync_to_async(cls._save_changes)(instance, changes, expected)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Updated %s ID=%s. Changed: %s. By user ID=%s",
+                cls.model.__name__,
+                pk,
+                cls._mask_sensitive_data(data),
+                user_id or pk,
+            )
+        return instance
+
+    @classmethod
+    def _check_owner(cls, instance: M, user_id: Optional[int]) -> None:
+        if cls.owner_field and user_id is not None:
+            check_ownership(getattr(instance, cls.owner_field), user_id)
+
+    @classmethod
+    def delete(
+        cls, pk: int, user_id: int = None, if_match: Optional[str] = None
+    ) -> None:
+        logger.warning(
+            "Deleting %s ID=%s by user ID=%s", cls.model.__name__, pk, user_id or pk
+        )
+        cls._delete_rows(pk, user_id, if_match)
+
+    @classmethod
+    async def adelete(
+        cls, pk: int, user_id: int = None, if_match: Optional[str] = None
+    ) -> None:
         logger.warning(
-            f"Deleting {cls.model.__name__} ID={pk} by user ID={user_id or pk}"
+            "Deleting %s ID=%s by user ID=%s", cls.model.__name__, pk, user_id or pk
+        )
+        await sync_to_async(cls._delete_rows)(pk, user_id, if_match)
+
+    @classmethod
+    def _delete_rows(
+        cls, pk: int, user_id: Optional[int], if_match: Optional[str] = None
+    ) -> None:
+        queryset = cls.model.objects.filter(pk=pk)
+        if cls.owner_field and user_id is not None:
+            queryset = queryset.filter(**{cls.owner_field: user_id})
+        condition = cls._etag_conditions(pk, if_match) if if_match else None
+        if condition is not None:
+            queryset = queryset.filter(condition)
+        with transaction.atomic():
+            state = cls.before_delete(queryset)
+            cls.invalidate_cache([pk], cascade=True)
+            # A single DELETE ... WHERE when nothing needs the instances
+            # (signals, cascades); otherwise Django's collector takes over.
+            deleted, _ = queryset.delete()
+            if deleted:
+                cls.after_delete(state)
+                return
+            transaction.set_rollback(True)
+
+        # Nothing matched, so only now tell a missing row from a foreign or
+        # stale one.
+        owners = cls.model.objects.filter(pk=pk).values_list(
+            cls.owner_field or "pk", flat=True
         )
-        instance.delete()
+        owners = list(owners)
+        if not owners:
+            cls._not_found(pk)
+        if cls.owner_field and user_id is not None and owners[0] != user_id:
+            raise PermissionDenied()
+        cls._precondition_failed(pk)
 
 
 def check_ownership(rhs, lhs):
@@ -1,41 +1,82 @@
-from typing import List
+from typing import List, Optional
 
 from django.contrib.auth.hashers import make_password
 from django.core.exceptions import PermissionDenied
-from ninja import Router
+from django.http import HttpResponse
 
-from src.core.auth import jwt_auth
+from src.core.responses import (
+    conditional_detail,
+    partial_response,
+    set_validators,
+    stream_response,
+    wants_ndjson,
+)
+from src.core.routing import DualRouter, call
 from src.core.services import check_ownership
 
 from .schemas import UserOutSchema, UserUpdateSchema
 from .services import UserCRUD
 
-router = Router(tags=["Users"])
+routes = DualRouter("Users")
+router = routes.sync
+async_router = routes.asynchronous
 
 
-@router.get("/", response=List[UserOutSchema], auth=jwt_auth)
-def list_users(request):
+@routes.get("/", response=List[UserOutSchema], budget=2, auth=True)
+async def list_users(
+    request,
+    response: HttpResponse,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+):
     if not request.user.is_staff:
         raise PermissionDenied()
-    return UserCRUD.list()
+    if stream or wants_ndjson(request):
+        return stream_response(
+            request, UserCRUD.stream(cursor=cursor, fields=fields), UserOutSchema
+        )
+    users, next_cursor = await call(
+        UserCRUD.list, cursor=cursor, limit=limit, fields=fields
+    )
+    if fields:
+        return partial_response(users, next_cursor)
+    if next_cursor:
+        response["X-Next-Cursor"] = next_cursor
+    return users
 
 
-@router.get("/{user_id}", response=UserOutSchema)
-def get_user(request, user_id: int):
-    return UserCRUD.retrieve(user_id)
+@routes.get(
+    "/{user_id}",
+    response=UserOutSchema,
+    budget=1,
+    decorators=[conditional_detail(UserCRUD, "user_id")],
+)
+async def get_user(
+    request, response: HttpResponse, user_id: int, fields: Optional[str] = None
+):
+    user = await call(UserCRUD.retrieve, user_id, fields=fields)
+    return partial_response(user) if fields else user
 
 
-@router.put("/{user_id}", response=UserOutSchema, auth=jwt_auth)
-def update_user(request, user_id: int, payload: UserUpdateSchema):
+@routes.put("/{user_id}", response=UserOutSchema, budget=5, auth=True)
+async def update_user(
+    request, response: HttpResponse, user_id: int, payload: UserUpdateSchema
+):
     check_ownership(request.auth.id, user_id)
     data = payload.dict(exclude_unset=True)
     if "password" in data:
-        data["password"] = make_password(data["password"])
-    return UserCRUD.update(user_id, data)
+        data["password"] = await call(make_password, data["password"])
+    user = await call(
+        UserCRUD.update, user_id, data, if_match=request.headers.get("If-Match")
+    )
+    set_validators(response, UserCRUD.version_of(user.pk, user))
+    return user
 
 
-@router.delete("/{user_id}", auth=jwt_auth)
-def delete_user(request, user_id: int):
+@routes.delete("/{user_id}", budget=13, auth=True)
+async def delete_user(request, user_id: int):
     check_ownership(request.auth.id, user_id)
-    UserCRUD.delete(user_id)
+    await call(UserCRUD.delete, user_id, if_match=request.headers.get("If-Match"))
     return {"success": True}
@@ -11,6 +11,9 @@ class User(AbstractUser, TimestampedModel):
     class Meta:
         db_table = "users"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="users_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.username
@@ -1,3 +1,12 @@
+from typing import Any, Dict, Optional
+
+from django.db.models import QuerySet
+
+from src.articles.models import Article
+from src.articles.services import ArticleCRUD
+from src.comments.models import Comment
+from src.comments.services import CommentCRUD
+from src.core.auth import invalidate_auth_user
 from src.core.services import BaseCRUD
 
 from .models import User
@@ -9,3 +18,55 @@ class UserCRUD(BaseCRUD):
     create_schema = UserCreateSchema
     update_schema = UserUpdateSchema
     out_schema = UserOutSchema
+    cache_dependents = (
+        ("src.articles.services.ArticleCRUD", "author_id"),
+        ("src.comments.services.CommentCRUD", "author_id"),
+    )
+
+    @classmethod
+    def before_delete(cls, queryset: QuerySet) -> None:
+        # The user's comments on other people's articles go away with the
+        # cascade, so those articles' counters are recomputed without them.
+        articles = Article.objects.filter(
+            pk__in=Comment.objects.filter(author__in=queryset).values("article_id")
+        ).exclude(author__in=queryset)
+        ArticleCRUD.drop_cached(articles.values_list("pk", flat=True))
+        CommentCRUD.recount(articles, author__in=queryset)
+
+    @classmethod
+    def update(
+        cls,
+        pk: int,
+        data: Dict[str, Any],
+        user_id: int = None,
+        if_match: Optional[str] = None,
+    ) -> User:
+        instance = super().update(pk, data, user_id=user_id, if_match=if_match)
+        invalidate_auth_user(pk)
+        return instance
+
+    @classmethod
+    def delete(
+        cls, pk: int, user_id: int = None, if_match: Optional[str] = None
+    ) -> None:
+        super().delete(pk, user_id=user_id, if_match=if_match)
+        invalidate_auth_user(pk)
+
+    @classmethod
+    async def aupdate(
+        cls,
+        pk: int,
+        data: Dict[str, Any],
+        user_id: int = None,
+        if_match: Optional[str] = None,
+    ) -> User:
+        instance = await super().aupdate(pk, data, user_id=user_id, if_match=if_match)
+        invalidate_auth_user(pk)
+        return instance
+
+    @classmethod
+    async def adelete(
+        cls, pk: int, user_id: int = None, if_match: Optional[str] = None
+    ) -> None:
+        await super().adelete(pk, user_id=user_id, if_match=if_match)
+        invalidate_auth_user(pk)
@@ -1,11 +1,30 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import time
+from io import StringIO
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from ninja.errors import HttpError
 from ninja_jwt.tokens import AccessToken
 from rest_framework.test import APIClient
 
 from src.articles.models import Article
+from src.articles.services import ArticleCRUD
+from src.comments.models import Comment
+from src.core.auth import clear_auth_user_cache
 from src.users.models import User
 
 
+def encode(cursor_values):
+    raw = json.dumps(cursor_values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
 class ArticlesAPITestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -35,6 +54,127 @@ class ArticlesAPITestCase(TestCase):
         self.assertEqual(data[0]["title"], "Original Title")
         self.assertEqual(data[0]["author"]["username"], "author")
 
+    def test_list_articles_cursor_pagination(self):
+        for i in range(4):
+            Article.objects.create(title=f"Article {i}", content="C", author=self.user)
+
+        response = self.client.get(self.list_url, {"limit": 3})
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        self.assertEqual(len(first_page), 3)
+        self.assertEqual(first_page[0]["title"], "Article 3")
+        next_cursor = response["X-Next-Cursor"]
+
+        response = self.client.get(self.list_url, {"limit": 3, "cursor": next_cursor})
+        self.assertEqual(response.status_code, 200)
+        second_page = response.json()
+        self.assertEqual(len(second_page), 2)
+        self.assertEqual(second_page[-1]["title"], "Original Title")
+        self.assertNotIn("X-Next-Cursor", response)
+
+        seen = {a["id"] for a in first_page} | {a["id"] for a in second_page}
+        self.assertEqual(len(seen), 5)
+
+    def test_list_articles_invalid_cursor(self):
+        response = self.client.get(self.list_url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_articles_cursor_with_invalid_values(self):
+        for values in (
+            ["2024-01-01T00:00:00", "abc"],
+            ["2024-13-45T00:00:00", 1],
+            ["2024-01-01T00:00:00", {"id": 1}],
+        ):
+            response = self.client.get(self.list_url, {"cursor": encode(values)})
+            self.assertEqual(response.status_code, 400, values)
+
+    def test_search_cursor_rank_must_be_numeric(self):
+        keys = ("rank", "id")
+        self.assertEqual(ArticleCRUD._decode_cursor(encode([0.5, 3]), keys), [0.5, 3])
+        for values in (["high", 3], [True, 3], [0.5, "abc"]):
+            with self.assertRaises(HttpError):
+                ArticleCRUD._decode_cursor(encode(values), keys)
+
+    def test_list_articles_streams_json_array(self):
+        Article.objects.create(title="Second", content="C", author=self.user)
+        response = self.client.get(self.list_url, {"stream": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([a["title"] for a in data], ["Second", "Original Title"])
+
+    def test_list_articles_streams_ndjson(self):
+        response = self.client.get(self.list_url, HTTP_ACCEPT="application/x-ndjson")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["author"]["username"], "author")
+
+    def test_list_articles_streams_sparse_fields(self):
+        with self.assertNumQueries(1) as ctx:
+            response = self.client.get(
+                self.list_url, {"stream": "true", "fields": "id,author.username"}
+            )
+            data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            data, [{"id": self.article.id, "author": {"username": "author"}}]
+        )
+        self.assertNotIn("content", ctx.captured_queries[-1]["sql"])
+
+    def test_list_articles_sparse_fields(self):
+        with self.assertNumQueries(1) as ctx:
+            response = self.client.get(self.list_url, {"fields": "id,title"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), [{"id": self.article.id, "title": "Original Title"}]
+        )
+        sql = ctx.captured_queries[0]["sql"]
+        self.assertNotIn("content", sql)
+        self.assertNotIn("JOIN", sql)
+
+    def test_list_articles_sparse_nested_field(self):
+        response = self.client.get(self.list_url, {"fields": "title,author.username"})
+        self.assertEqual(
+            response.json(),
+            [{"title": "Original Title", "author": {"username": "author"}}],
+        )
+
+    def test_list_articles_unknown_field(self):
+        response = self.client.get(self.list_url, {"fields": "title,password"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_retrieve_article_sparse_fields(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, {"fields": "title"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"title": "Original Title"})
+        self.assertEqual(response["ETag"], self.client.get(self.detail_url)["ETag"])
+
+    def test_search_articles(self):
+        Article.objects.create(title="Django tips", content="ORM", author=self.user)
+        Article.objects.create(title="Other", content="About django", author=self.user)
+
+        response = self.client.get(f"{self.list_url}search", {"q": "django"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        response = self.client.get(
+            f"{self.list_url}search", {"q": "django", "limit": 1}
+        )
+        self.assertEqual(len(response.json()), 1)
+        response = self.client.get(
+            f"{self.list_url}search",
+            {"q": "django", "cursor": response["X-Next-Cursor"]},
+        )
+        self.assertEqual([a["title"] for a in response.json()], ["Django tips"])
+
+    def test_search_sees_writes_outside_the_api(self):
+        # On PostgreSQL the search_vector is kept by a trigger, not ArticleCRUD.
+        Article.objects.filter(pk=self.article.pk).update(title="Postgres notes")
+        response = self.client.get(f"{self.list_url}search", {"q": "postgres"})
+        self.assertEqual([a["id"] for a in response.json()], [self.article.id])
+
     def test_retrieve_article_success(self):
         response = self.client.get(self.detail_url)
         self.assertEqual(response.status_code, 200)
@@ -49,6 +189,163 @@ class ArticlesAPITestCase(TestCase):
         self.assertEqual(response.json()["title"], "New Article")
         self.assertEqual(Article.objects.count(), 2)
 
+    def test_create_article_stores_excerpt(self):
+        data = {"title": "Long", "content": "word " * 100}
+        response = self.client.post(
+            self.list_url, data, format="json", **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        article = Article.objects.get(id=response.json()["id"])
+        self.assertEqual(article.word_count, 100)
+        self.assertTrue(article.excerpt.endswith("…"))
+        self.assertLessEqual(len(article.excerpt), 300)
+
+    def test_list_articles_summary_view(self):
+        with self.assertNumQueries(1) as ctx:
+            response = self.client.get(self.list_url, {"view": "summary"})
+        self.assertEqual(response.status_code, 200)
+        item = response.json()[0]
+        self.assertEqual(item["author"], {"username": "author"})
+        self.assertNotIn("content", item)
+        self.assertNotIn("content", ctx.captured_queries[0]["sql"])
+
+    def test_backfill_article_excerpts(self):
+        call_command("backfill_article_excerpts", stdout=StringIO())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.excerpt, "Original Content")
+        self.assertEqual(self.article.word_count, 2)
+
+    def test_bulk_create_articles(self):
+        items = [
+            {"title": "First", "content": "One two three"},
+            {"title": "x" * 300, "content": "Too long a title"},
+            {"title": "Third", "content": "Four"},
+        ]
+        response = self.client.post(
+            f"{self.list_url}bulk", items, format="json", **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual([r["success"] for r in results], [True, False, True])
+        self.assertIn("title", results[1]["errors"])
+
+        first = Article.objects.get(pk=results[0]["id"])
+        self.assertEqual(first.author, self.user)
+        self.assertEqual(first.excerpt, "One two three")
+        self.assertEqual(first.word_count, 3)
+        self.assertEqual(Article.objects.count(), 3)
+
+    def test_bulk_create_articles_reports_schema_errors_per_item(self):
+        items = [
+            {"title": "First", "content": "Body"},
+            {"title": "No content"},
+            {"title": ["not", "a", "string"], "content": "Body"},
+            "not an object",
+        ]
+        response = self.client.post(
+            f"{self.list_url}bulk", items, format="json", **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual([r["success"] for r in results], [True, False, False, False])
+        self.assertIn("content", results[1]["errors"])
+        self.assertIn("title", results[2]["errors"])
+        self.assertEqual(results[3]["errors"], {"__all__": ["Expected an object"]})
+        self.assertEqual(Article.objects.count(), 2)
+
+    @override_settings(BULK_CREATE_MAX_ITEMS=1)
+    def test_bulk_create_articles_too_many_items(self):
+        items = [{"title": "A", "content": "A"}, {"title": "B", "content": "B"}]
+        response = self.client.post(
+            f"{self.list_url}bulk", items, format="json", **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Article.objects.count(), 1)
+
+    def test_retrieve_article_not_modified(self):
+        response = self.client.get(self.detail_url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        # the version probe only
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        Comment.objects.create(article=self.article, author=self.user, content="C")
+        Article.objects.filter(pk=self.article.pk).update(comment_count=1)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_retrieve_article_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_articles_not_modified(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Article.objects.create(title="Newer", content="Content", author=self.user)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_list_etag_covers_the_page_and_its_parameters(self):
+        Article.objects.create(title="Second", content="Content", author=self.user)
+        first = self.client.get(self.list_url, {"limit": 1})
+        self.assertNotIn("Last-Modified", first)
+        etags = {
+            first["ETag"],
+            self.client.get(self.list_url)["ETag"],
+            self.client.get(
+                self.list_url, {"limit": 1, "cursor": first["X-Next-Cursor"]}
+            )["ETag"],
+            self.client.get(self.list_url, {"fields": "id"})["ETag"],
+            self.client.get(self.list_url, {"view": "summary"})["ETag"],
+        }
+        self.assertEqual(len(etags), 5)
+
+        # Sparse pages are versioned by their body.
+        etag = self.client.get(self.list_url, {"fields": "id,title"})["ETag"]
+        response = self.client.get(
+            self.list_url, {"fields": "id,title"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        Article.objects.filter(pk=self.article.pk).update(title="Renamed")
+        response = self.client.get(
+            self.list_url, {"fields": "id,title"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_streams_have_no_validators(self):
+        response = self.client.get(self.list_url, {"stream": "true"})
+        self.assertNotIn("ETag", response)
+
+    def test_author_change_invalidates_article_etags(self):
+        detail_etag = self.client.get(self.detail_url)["ETag"]
+        list_etag = self.client.get(self.list_url)["ETag"]
+
+        response = self.client.put(
+            f"/api/v1/users/{self.user.id}",
+            {"bio": "New bio"},
+            format="json",
+            **self.auth_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["author"]["bio"], "New bio")
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+
     def test_create_article_unauthenticated_forbidden(self):
         data = {"title": "No Auth", "content": "Should fail"}
         response = self.client.post(self.list_url, data, format="json")
@@ -64,6 +361,90 @@ class ArticlesAPITestCase(TestCase):
         self.article.refresh_from_db()
         self.assertEqual(self.article.title, "Updated Title")
 
+    def test_update_article_queries(self):
+        clear_auth_user_cache()
+        # user, article with author, SAVEPOINT, UPDATE, RELEASE
+        with self.assertNumQueries(5) as ctx:
+            response = self.client.put(
+                self.detail_url, {"title": "New"}, format="json", **self.auth_headers
+            )
+        self.assertEqual(response.status_code, 200)
+        update = ctx.captured_queries[3]["sql"]
+        self.assertTrue(update.startswith("UPDATE"))
+        self.assertNotIn('"content"', update)
+
+    def test_update_article_unchanged_skips_write(self):
+        clear_auth_user_cache()
+        with self.assertNumQueries(2):
+            response = self.client.put(
+                self.detail_url,
+                {"title": "Original Title"},
+                format="json",
+                **self.auth_headers,
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_article_if_match(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.put(
+            self.detail_url,
+            {"title": "Fresh"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+            **self.auth_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response["ETag"], self.client.get(self.detail_url)["ETag"])
+
+        response = self.client.put(
+            self.detail_url,
+            {"title": "Lost update"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+            **self.auth_headers,
+        )
+        self.assertEqual(response.status_code, 412)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, "Fresh")
+
+    def test_update_article_if_match_ignores_new_comments(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        token = AccessToken.for_user(self.other_user)
+        response = self.client.post(
+            "/api/v1/comments/",
+            {"article_id": self.article.id, "content": "First!"},
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(self.client.get(self.detail_url)["ETag"], etag)
+
+        response = self.client.put(
+            self.detail_url,
+            {"title": "Still mine"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+            **self.auth_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_article_if_match(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        Article.objects.filter(pk=self.article.pk).update(updated_at=timezone.now())
+        response = self.client.delete(
+            self.detail_url, HTTP_IF_MATCH=etag, **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 412)
+        self.assertTrue(Article.objects.filter(id=self.article.id).exists())
+
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.delete(
+            self.detail_url, HTTP_IF_MATCH=etag, **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Article.objects.filter(id=self.article.id).exists())
+
     def test_update_article_non_owner_forbidden(self):
         other_token = AccessToken.for_user(self.other_user)
         other_headers = {"HTTP_AUTHORIZATION": f"Bearer {other_token}"}
@@ -79,6 +460,18 @@ class ArticlesAPITestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertFalse(Article.objects.filter(id=self.article.id).exists())
 
+    def test_delete_article_cascades_comments(self):
+        Comment.objects.create(
+            article=self.article, author=self.other_user, content="C"
+        )
+        response = self.client.delete(self.detail_url, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_delete_missing_article_not_found(self):
+        response = self.client.delete(f"{self.list_url}999999", **self.auth_headers)
+        self.assertEqual(response.status_code, 404)
+
     def test_delete_article_non_owner_forbidden(self):
         other_token = AccessToken.for_user(self.other_user)
         other_headers = {"HTTP_AUTHORIZATION": f"Bearer {other_token}"}
@@ -86,3 +479,59 @@ class ArticlesAPITestCase(TestCase):
         response = self.client.delete(self.detail_url, **other_headers)
         self.assertEqual(response.status_code, 403)
         self.assertTrue(Article.objects.filter(id=self.article.id).exists())
+
+
+@override_settings(CRUD_CACHE_TIMEOUT=60)
+class ArticleCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="author", password="pass1234")
+        self.article = Article.objects.create(
+            title="Cached", content="Content", author=self.user
+        )
+        token = AccessToken.for_user(self.user)
+        self.auth_headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.detail_url = f"/api/v1/articles/{self.article.id}"
+
+    def test_retrieve_is_served_from_cache(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.json()["title"], "Cached")
+
+    def test_update_invalidates_cache(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                self.detail_url, {"title": "Fresh"}, format="json", **self.auth_headers
+            )
+        self.assertEqual(self.client.get(self.detail_url).json()["title"], "Fresh")
+
+    def test_async_fill_waits_without_holding_sync_thread(self):
+        key = ArticleCRUD._cache_key(self.article.id)
+        cache.add(f"{key}:lock", 1, ArticleCRUD.cache_lock_timeout)
+
+        async def load_elsewhere():
+            waiter = asyncio.ensure_future(ArticleCRUD.aretrieve(self.article.id))
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            # Queued behind the waiter if it slept on the shared sync thread.
+            await sync_to_async(cache.set)(key, {"title": "Loaded elsewhere"})
+            return await waiter, time.monotonic() - started
+
+        data, elapsed = async_to_sync(load_elsewhere)()
+        self.assertEqual(data["title"], "Loaded elsewhere")
+        self.assertLess(elapsed, 1)
+
+    def test_author_update_invalidates_cached_articles(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                f"/api/v1/users/{self.user.id}",
+                {"bio": "New bio"},
+                format="json",
+                **self.auth_headers,
+            )
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.json()["author"]["bio"], "New bio")
@@ -0,0 +1,133 @@
+from django.test import TestCase
+from ninja_jwt.tokens import AccessToken
+from rest_framework.test import APIClient
+
+from src.articles.models import Article
+from src.comments.models import Comment
+from src.core.auth import clear_auth_user_cache
+from src.users.models import User
+
+
+class AsyncAPITestCase(TestCase):
+    def setUp(self):
+        clear_auth_user_cache()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="author", password="pass1234")
+        self.other_user = User.objects.create_user(
+            username="other", password="pass1234"
+        )
+        self.article = Article.objects.create(
+            title="Async Title", content="Content", author=self.user
+        )
+        Comment.objects.create(article=self.article, author=self.user, content="Hi")
+
+        token = AccessToken.for_user(self.user)
+        self.auth_headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+        self.articles_url = "/api/v1/async/articles/"
+        self.article_url = f"/api/v1/async/articles/{self.article.id}"
+
+    def test_list_articles(self):
+        response = self.client.get(self.articles_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["author"]["username"], "author")
+
+    def test_retrieve_article(self):
+        response = self.client.get(self.article_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Async Title")
+
+    def test_retrieve_article_not_modified(self):
+        etag = self.client.get(self.article_url)["ETag"]
+        response = self.client.get(self.article_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_article_comments(self):
+        response = self.client.get(f"{self.article_url}/comments")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["article_title"], "Async Title")
+
+    def test_create_article(self):
+        response = self.client.post(
+            self.articles_url,
+            {"title": "New", "content": "Body"},
+            format="json",
+            **self.auth_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["author"]["id"], self.user.id)
+
+    def test_create_comment(self):
+        response = self.client.post(
+            "/api/v1/async/comments/",
+            {"article_id": self.article.id, "content": "Async comment"},
+            format="json",
+            **self.auth_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["article_id"], self.article.id)
+
+    def test_update_article_non_owner_forbidden(self):
+        token = AccessToken.for_user(self.other_user)
+        response = self.client.put(
+            self.article_url,
+            {"title": "Hijack"},
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_delete_article(self):
+        response = self.client.delete(self.article_url, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Article.objects.filter(id=self.article.id).exists())
+
+    def test_update_user(self):
+        response = self.client.put(
+            f"/api/v1/async/users/{self.user.id}",
+            {"bio": "Async bio"},
+            format="json",
+            **self.auth_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["bio"], "Async bio")
+
+    def test_sparse_fields(self):
+        response = self.client.get(f"{self.articles_url}?fields=id,title")
+        self.assertEqual(
+            response.json(), [{"id": self.article.id, "title": "Async Title"}]
+        )
+        response = self.client.get(f"{self.article_url}?fields=title,author.username")
+        self.assertEqual(
+            response.json(), {"title": "Async Title", "author": {"username": "author"}}
+        )
+        sync = self.client.get(f"/api/v1/articles/{self.article.id}?fields=title")
+        self.assertEqual(response["ETag"], sync["ETag"])
+
+    def test_search_articles(self):
+        response = self.client.get(f"{self.articles_url}search?q=Async")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a["id"] for a in response.json()], [self.article.id])
+
+    def test_routes_match_sync_api(self):
+        from src.core.api import api
+
+        routes = {}
+        for prefix, router in api._routers:
+            for path, path_view in router.path_operations.items():
+                for operation in path_view.operations:
+                    routes[(prefix, path, tuple(operation.methods))] = operation
+        for (prefix, path, methods), operation in routes.items():
+            if not prefix.startswith("/async/"):
+                continue
+            sync = routes[(prefix[len("/async") :], path, methods)]
+            self.assertEqual(
+                operation.view_func.__name__, f"{sync.view_func.__name__}_async"
+            )
+            self.assertEqual(
+                operation.view_func.query_budget, sync.view_func.query_budget
+            )
+            self.assertEqual(
+                set(operation.signature.signature.parameters),
+                set(sync.signature.signature.parameters),
+            )
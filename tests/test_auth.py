@@ -1,12 +1,24 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from ninja_jwt.tokens import AccessToken, RefreshToken
+from prometheus_client import REGISTRY
 from rest_framework.test import APIClient
 
+from src.core.auth import clear_auth_user_cache, token_cache
+from src.core.hashing import amake_password, get_pool
+
 User = get_user_model()
 
 
 class AuthAPITestCase(TestCase):
     def setUp(self):
+        clear_auth_user_cache()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username="testuser",
@@ -113,3 +125,197 @@ class AuthAPITestCase(TestCase):
 
         self.assertEqual(User.objects.count(), initial_count + 1)
         self.assertTrue(User.objects.filter(username="database_test_user").exists())
+
+    def test_authenticated_user_is_cached_between_requests(self):
+        token = AccessToken.for_user(self.user)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+        with self.assertNumQueries(1):
+            self.client.post(self.logout_url, **headers)
+        with self.assertNumQueries(0):
+            response = self.client.post(self.logout_url, **headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_update_invalidates_cached_user(self):
+        token = AccessToken.for_user(self.user)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        list_url = "/api/v1/users/"
+
+        self.assertEqual(self.client.get(list_url, **headers).status_code, 403)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.client.put(
+            f"/api/v1/users/{self.user.id}", {"bio": "Staff"}, format="json", **headers
+        )
+        self.assertEqual(self.client.get(list_url, **headers).status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AuditLogTestCase(TestCase):
+    def test_every_login_is_logged(self):
+        users = User.objects.bulk_create(
+            User(username=f"user{i}", password=make_password("pass1234"))
+            for i in range(50)
+        )
+        client = APIClient()
+        with self.assertLogs("src.core.auth", "INFO") as logs:
+            for user in users:
+                response = client.post(
+                    "/api/v1/auth/login",
+                    {"username": user.username, "password": "pass1234"},
+                    format="json",
+                )
+                self.assertEqual(response.status_code, 200)
+        audit = [line for line in logs.output if line.endswith("logged.")]
+        self.assertEqual(len(audit), 50)
+
+
+@override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0)
+class PasswordHashingPoolTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="pass1234")
+
+    def occupy_pool(self):
+        gate = threading.Event()
+        get_pool().submit(gate.wait, 5)
+        self.addCleanup(gate.set)
+
+    def test_hashing_runs_on_pool_threads(self):
+        name = get_pool().submit(lambda: threading.current_thread().name).result()
+        self.assertTrue(name.startswith("hashing"))
+
+        encoded = async_to_sync(amake_password)("secret123")
+        self.assertTrue(check_password("secret123", encoded))
+        self.assertTrue(self.user.check_password("pass1234"))
+
+    def test_login_rejected_when_pool_is_full(self):
+        self.occupy_pool()
+        response = self.client.post(
+            "/api/v1/auth/login",
+            {"username": "testuser", "password": "pass1234"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(response.json()["code"], "hashing_busy")
+
+    def test_register_and_password_change_rejected_when_pool_is_full(self):
+        token = AccessToken.for_user(self.user)
+        self.occupy_pool()
+
+        response = self.client.post(
+            "/api/v1/auth/register",
+            {"username": "newcomer", "password": "pass1234"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(username="newcomer").exists())
+
+        for url in ("/api/v1/users/", "/api/v1/async/users/"):
+            response = self.client.put(
+                f"{url}{self.user.id}",
+                {"password": "changed123"},
+                format="json",
+                HTTP_AUTHORIZATION=f"Bearer {token}",
+            )
+            self.assertEqual(response.status_code, 503)
+
+
+# Room for every thread, so only the database decides who registers.
+@override_settings(PASSWORD_HASH_QUEUE=12)
+class ConcurrentRegistrationTestCase(TransactionTestCase):
+    threads = 12
+
+    def register_all(self, usernames):
+        barrier = threading.Barrier(len(usernames))
+
+        def register(username):
+            client = APIClient()
+            barrier.wait()
+            try:
+                response = client.post(
+                    "/api/v1/auth/register",
+                    {"username": username, "password": "pass1234"},
+                    format="json",
+                )
+                return response.status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(usernames)) as pool:
+            return sorted(pool.map(register, usernames))
+
+    def test_same_username_registers_once(self):
+        statuses = self.register_all(["racer"] * self.threads)
+
+        self.assertEqual(statuses, [201] + [400] * (self.threads - 1))
+        self.assertEqual(User.objects.filter(username="racer").count(), 1)
+
+    def test_distinct_usernames_all_register(self):
+        usernames = [f"user{i}" for i in range(self.threads)]
+        statuses = self.register_all(usernames)
+
+        self.assertEqual(statuses, [201] * self.threads)
+        self.assertEqual(User.objects.filter(username__in=usernames).count(), 12)
+
+
+class VerifiedTokenCacheTestCase(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="pass1234")
+        self.token = str(AccessToken.for_user(self.user))
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {self.token}"}
+
+    def lookups(self, result):
+        labels = {"result": result}
+        return REGISTRY.get_sample_value("auth_token_cache_requests_total", labels) or 0
+
+    def test_repeat_requests_skip_verification(self):
+        hits, misses = self.lookups("hit"), self.lookups("miss")
+        for url in ("/api/v1/users/", "/api/v1/async/users/", "/api/v1/users/"):
+            self.client.get(url, **self.headers)
+
+        self.assertEqual(self.lookups("miss"), misses + 1)
+        self.assertEqual(self.lookups("hit"), hits + 2)
+        self.assertIsNotNone(token_cache.get(self.token))
+
+    def test_invalid_tokens_are_not_cached(self):
+        response = self.client.get(
+            "/api/v1/users/", HTTP_AUTHORIZATION="Bearer not-a-token"
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(token_cache.entries), 0)
+
+    def test_expired_entries_are_dropped(self):
+        token = AccessToken.for_user(self.user)
+        token_cache.put("expired", token)
+        token_cache.entries[token_cache.key("expired")] = (0, token)
+
+        self.assertIsNone(token_cache.get("expired"))
+        self.assertEqual(len(token_cache.entries), 0)
+
+    @override_settings(AUTH_TOKEN_CACHE_SIZE=2)
+    def test_least_recently_used_entry_is_evicted(self):
+        tokens = [AccessToken.for_user(self.user) for _ in range(3)]
+        token_cache.put("a", tokens[0])
+        token_cache.put("b", tokens[1])
+        token_cache.get("a")
+        token_cache.put("c", tokens[2])
+
+        self.assertIsNotNone(token_cache.get("a"))
+        self.assertIsNone(token_cache.get("b"))
+        self.assertIsNotNone(token_cache.get("c"))
+
+    def test_logout_and_refresh_evict_the_presented_token(self):
+        self.client.post("/api/v1/auth/logout", **self.headers)
+        self.assertIsNone(token_cache.get(self.token))
+
+        self.client.get("/api/v1/users/", **self.headers)
+        self.assertIsNotNone(token_cache.get(self.token))
+        refresh = str(RefreshToken.for_user(self.user))
+        response = self.client.post(
+            "/api/v1/auth/refresh", {"refresh": refresh}, format="json", **self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(token_cache.get(self.token))
@@ -0,0 +1,47 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from src.articles.models import Article
+from src.comments.models import Comment
+from src.users.models import User
+
+
+class BenchmarkCommandsTestCase(TestCase):
+    def setUp(self):
+        call_command(
+            "generate_fake_data",
+            users=5,
+            articles=20,
+            comments=3,
+            stdout=StringIO(),
+        )
+
+    def test_generate_fake_data(self):
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Article.objects.count(), 20)
+        self.assertEqual(Article.objects.exclude(excerpt="").count(), 20)
+        for article in Article.objects.annotate(total=Count("comments")):
+            self.assertEqual(article.comment_count, article.total)
+
+    def test_benchmark_api_reports_json(self):
+        out = StringIO()
+        call_command("benchmark_api", requests=2, warmup=1, only="article", stdout=out)
+        report = json.loads(out.getvalue())
+
+        routes = {result["route"] for result in report["results"]}
+        self.assertIn("get_article", routes)
+        self.assertIn("delete_article_async", routes)
+        self.assertEqual(report["uncovered"], [])
+        for result in report["results"]:
+            self.assertEqual(result["errors"], 0, result["route"])
+            self.assertEqual(result["requests"], 2)
+            self.assertGreater(result["queries"]["mean"], 0, result["route"])
+
+        # Fixtures and everything written through the API are removed again.
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Article.objects.count(), 20)
+        self.assertFalse(Comment.objects.filter(content="Doomed").exists())
@@ -1,9 +1,15 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from ninja_jwt.tokens import AccessToken
 from rest_framework.test import APIClient
 
 from src.articles.models import Article
 from src.comments.models import Comment
+from src.core.auth import clear_auth_user_cache
 from src.users.models import User
 
 
@@ -36,6 +42,45 @@ class CommentsAPITestCase(TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["content"], "Nice!")
 
+    def test_list_comments_filtered_by_article(self):
+        other_article = Article.objects.create(
+            title="Other", content="Content", author=self.other_user
+        )
+        Comment.objects.create(article=other_article, author=self.user, content="Hi")
+
+        response = self.client.get(self.list_url, {"article_id": self.article.id})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["article_id"], self.article.id)
+
+    def test_list_article_comments_paginates(self):
+        for i in range(2):
+            Comment.objects.create(
+                article=self.article, author=self.other_user, content=f"Reply {i}"
+            )
+        url = f"/api/v1/articles/{self.article.id}/comments"
+
+        response = self.client.get(url, {"limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [c["content"] for c in response.json()], ["Reply 1", "Reply 0"]
+        )
+
+        response = self.client.get(url, {"cursor": response["X-Next-Cursor"]})
+        self.assertEqual([c["content"] for c in response.json()], ["Nice!"])
+
+    def test_list_article_comments_missing_article(self):
+        response = self.client.get("/api/v1/articles/999999/comments")
+        self.assertEqual(response.status_code, 404)
+
+    def test_retrieve_comment_sparse_fields(self):
+        response = self.client.get(self.detail_url, {"fields": "content,article_title"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {"content": "Nice!", "article_title": "For Comments"}
+        )
+
     def test_retrieve_comment_success(self):
         response = self.client.get(self.detail_url)
         self.assertEqual(response.status_code, 200)
@@ -57,6 +102,36 @@ class CommentsAPITestCase(TestCase):
         )
         self.assertEqual(response.status_code, 422)
 
+    def test_bulk_create_comments(self):
+        other_article = Article.objects.create(
+            title="Other", content="Content", author=self.other_user
+        )
+        items = [
+            {"content": "A", "article_id": self.article.id},
+            {"content": "B", "article_id": other_article.id},
+            {"content": "C", "article_id": 999999},
+            {"content": "D", "article_id": self.article.id},
+            {"content": "E"},
+        ]
+        clear_auth_user_cache()
+        # user, in_bulk, SAVEPOINT, INSERT, recount, RELEASE
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                f"{self.list_url}bulk", items, format="json", **self.auth_headers
+            )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual(
+            [r["success"] for r in results], [True, True, False, True, False]
+        )
+        self.assertEqual(results[2]["errors"], {"article_id": ["Article not found"]})
+        self.assertEqual(results[4]["errors"], {"article_id": ["Field required"]})
+
+        self.article.refresh_from_db()
+        other_article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 3)
+        self.assertEqual(other_article.comment_count, 1)
+
     def test_create_comment_unauthenticated_forbidden(self):
         data = {"content": "No auth", "article_id": self.article.id}
         response = self.client.post(self.list_url, data, format="json")
@@ -70,6 +145,18 @@ class CommentsAPITestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["content"], "Edited")
 
+    def test_update_comment_queries(self):
+        clear_auth_user_cache()
+        # user, comment with article and author, SAVEPOINT, UPDATE, RELEASE
+        with self.assertNumQueries(5):
+            response = self.client.put(
+                self.detail_url,
+                {"content": "Edited"},
+                format="json",
+                **self.auth_headers,
+            )
+        self.assertEqual(response.status_code, 200)
+
     def test_update_comment_non_owner_forbidden(self):
         other_token = AccessToken.for_user(self.other_user)
         other_headers = {"HTTP_AUTHORIZATION": f"Bearer {other_token}"}
@@ -85,10 +172,106 @@ class CommentsAPITestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertFalse(Comment.objects.filter(id=self.comment.id).exists())
 
+    def test_delete_comment_queries(self):
+        Article.objects.filter(pk=self.article.pk).update(comment_count=1)
+        clear_auth_user_cache()
+        # user, SAVEPOINT, article id, DELETE, counter UPDATE, RELEASE
+        with self.assertNumQueries(6) as ctx:
+            response = self.client.delete(self.detail_url, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(ctx.captured_queries[3]["sql"].startswith("DELETE"))
+        self.assertTrue(ctx.captured_queries[4]["sql"].startswith("UPDATE"))
+        self.assertFalse(Comment.objects.filter(id=self.comment.id).exists())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 0)
+
+    def test_article_change_invalidates_comment_etag(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.put(
+            f"/api/v1/articles/{self.article.id}",
+            {"title": "Renamed"},
+            format="json",
+            **self.auth_headers,
+        )
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["article_title"], "Renamed")
+
+    def test_delete_comment_stale_if_match(self):
+        Article.objects.filter(pk=self.article.pk).update(comment_count=1)
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.client.put(
+            self.detail_url, {"content": "Edited"}, format="json", **self.auth_headers
+        )
+
+        response = self.client.delete(
+            self.detail_url, HTTP_IF_MATCH=etag, **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 412)
+        self.assertTrue(Comment.objects.filter(id=self.comment.id).exists())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+
+    def test_delete_missing_comment_not_found(self):
+        response = self.client.delete(f"{self.list_url}999999", **self.auth_headers)
+        self.assertEqual(response.status_code, 404)
+
     def test_delete_comment_non_owner_forbidden(self):
         other_token = AccessToken.for_user(self.other_user)
         other_headers = {"HTTP_AUTHORIZATION": f"Bearer {other_token}"}
 
-        response = self.client.delete(self.detail_url, **other_headers)
+        Article.objects.filter(pk=self.article.pk).update(comment_count=1)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.delete(self.detail_url, **other_headers)
         self.assertEqual(response.status_code, 403)
+        # No counter write to roll back when nothing was deleted.
+        writes = [q["sql"] for q in ctx.captured_queries if "UPDATE" in q["sql"]]
+        self.assertEqual(writes, [])
         self.assertTrue(Comment.objects.filter(id=self.comment.id).exists())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+
+    def test_create_comment_increments_article_count(self):
+        Article.objects.filter(pk=self.article.pk).update(comment_count=1)
+        self.client.post(
+            self.list_url,
+            {"content": "Another", "article_id": self.article.id},
+            format="json",
+            **self.auth_headers,
+        )
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 2)
+
+    def test_delete_comment_decrements_article_count(self):
+        Article.objects.filter(pk=self.article.pk).update(comment_count=1)
+        self.client.delete(self.detail_url, **self.auth_headers)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 0)
+
+    def test_delete_user_recounts_commented_articles(self):
+        other_article = Article.objects.create(
+            title="Other", content="Content", author=self.other_user
+        )
+        Comment.objects.create(article=other_article, author=self.user, content="A")
+        Comment.objects.create(
+            article=other_article, author=self.other_user, content="B"
+        )
+        Article.objects.filter(pk=other_article.pk).update(comment_count=2)
+
+        self.client.delete(f"/api/v1/users/{self.user.id}", **self.auth_headers)
+        other_article.refresh_from_db()
+        self.assertEqual(other_article.comment_count, 1)
+
+    def test_reconcile_comment_counts(self):
+        Article.objects.filter(pk=self.article.pk).update(comment_count=7)
+        empty = Article.objects.create(title="Empty", content="C", author=self.user)
+        Article.objects.filter(pk=empty.pk).update(comment_count=3)
+
+        call_command("reconcile_comment_counts", stdout=StringIO())
+        self.article.refresh_from_db()
+        empty.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+        self.assertEqual(empty.comment_count, 0)
@@ -0,0 +1,92 @@
+import time
+
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from src.articles.models import Article
+from src.articles.services import ArticleCRUD
+from src.core.db import PIN_COOKIE, REPLICA, PrimaryReplicaRouter, ReplicaPinMiddleware
+from src.users.models import User
+
+
+@override_settings(REPLICA_PIN_SECONDS=30)
+class PrimaryReplicaTestCase(TestCase):
+    def setUp(self):
+        # A second alias backed by the test connection, so the replica sees
+        # the test's data the way a caught-up replica would.
+        connections.settings[REPLICA] = connections.settings["default"]
+        connections[REPLICA] = connections["default"]
+        self.addCleanup(connections.settings.pop, REPLICA)
+        self.addCleanup(connections.__delitem__, REPLICA)
+
+        self.user = User.objects.create_user(username="author")
+        self.article = Article.objects.create(
+            title="Title", content="Content", author=self.user
+        )
+        self.factory = RequestFactory()
+
+    def read(self, request):
+        seen = {}
+
+        def view(request):
+            articles, _ = ArticleCRUD.list()
+            seen["list"] = articles[0]._state.db
+            seen["retrieve"] = ArticleCRUD.retrieve(self.article.id)._state.db
+            return HttpResponse()
+
+        response = ReplicaPinMiddleware(view)(request)
+        return seen, response
+
+    def test_router(self):
+        router = PrimaryReplicaRouter()
+        self.assertIsNone(router.db_for_read(Article))
+        self.assertEqual(router.db_for_write(Article), "default")
+        self.assertIsNone(router.db_for_read(Article, instance=self.article))
+
+    def test_crud_reads_use_replica(self):
+        seen, _ = self.read(self.factory.get("/"))
+        self.assertEqual(seen, {"list": REPLICA, "retrieve": REPLICA})
+        # Writes and reads outside BaseCRUD stay on the primary.
+        self.assertEqual(Article.objects.get(pk=self.article.id)._state.db, "default")
+        self.assertEqual(ArticleCRUD.get_object(self.article.id)._state.db, "default")
+
+    def test_streams_keep_the_replica_chosen_by_the_view(self):
+        # The rows are read after the view returns, outside replica_reads().
+        rows = ArticleCRUD.stream()
+        self.assertEqual(next(rows)._state.db, REPLICA)
+
+    def test_writes_pin_client_to_primary(self):
+        seen, response = self.read(self.factory.post("/"))
+        self.assertEqual(seen, {"list": "default", "retrieve": "default"})
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 30)
+        self.assertTrue(cookie["httponly"])
+
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = cookie.value
+        seen, response = self.read(request)
+        self.assertEqual(seen, {"list": "default", "retrieve": "default"})
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_pin_expires(self):
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = str(int(time.time()) - 1)
+        seen, _ = self.read(request)
+        self.assertEqual(seen, {"list": REPLICA, "retrieve": REPLICA})
+
+    def test_failed_writes_do_not_pin(self):
+        def view(request):
+            return HttpResponse(status=400)
+
+        response = ReplicaPinMiddleware(view)(self.factory.post("/"))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class NoReplicaTestCase(TestCase):
+    def test_reads_stay_on_primary(self):
+        user = User.objects.create_user(username="author")
+        article = Article.objects.create(title="Title", content="Body", author=user)
+        articles, _ = ArticleCRUD.list()
+        self.assertEqual(articles[0]._state.db, "default")
+        self.assertEqual(ArticleCRUD.retrieve(article.id)._state.db, "default")
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from src.core.log import QueuedHandler, SamplingFilter
+
+
+class BlockingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.records = []
+
+    def emit(self, record):
+        self.gate.wait(5)
+        self.records.append(self.format(record))
+
+
+class QueuedHandlerTestCase(SimpleTestCase):
+    def make_logger(self, handler):
+        logger = logging.getLogger(f"tests.log.{id(handler)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger
+
+    def test_records_are_written_by_listener(self):
+        handler = QueuedHandler("tests.test_log.BlockingHandler")
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        handler.target.gate.set()
+        logger = self.make_logger(handler)
+
+        logger.info("Retrieved %s ID=%s", "Article", 1)
+        handler.close()
+        self.assertEqual(handler.target.records, ["INFO Retrieved Article ID=1"])
+
+    def test_full_queue_drops_and_reports(self):
+        handler = QueuedHandler("tests.test_log.BlockingHandler", maxsize=2)
+        logger = self.make_logger(handler)
+
+        for i in range(5):
+            logger.info("record %s", i)
+        self.assertGreater(handler.dropped, 0)
+
+        handler.target.gate.set()
+        handler.listener.queue.join()
+        logger.info("after")
+        handler.close()
+        self.assertTrue(any("Dropped" in r for r in handler.target.records))
+        self.assertEqual(handler.target.records[-1], "after")
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class SamplingFilterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.handler = ListHandler()
+        self.filter = SamplingFilter(limit=2, window=0.05)
+        self.logger = logging.getLogger(f"tests.sampling.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+        self.logger.addFilter(self.filter)
+
+    def test_limits_per_path_and_status(self):
+        for _ in range(5):
+            self.logger.warning(
+                "Invalid token attempt: %s",
+                "/a",
+                extra={"path": "/a", "status": 401},
+            )
+        self.logger.warning(
+            "Invalid token attempt: %s", "/b", extra={"path": "/b", "status": 401}
+        )
+        self.assertEqual(
+            self.handler.messages,
+            ["Invalid token attempt: /a"] * 2 + ["Invalid token attempt: /b"],
+        )
+
+    def test_summary_after_window(self):
+        extra = {"path": "/a", "status": 401}
+        for i in range(4):
+            self.logger.info("Token error: %s", i, extra=extra)
+        time.sleep(0.06)
+        self.logger.info("Token error: %s", "later", extra=extra)
+        self.assertEqual(len(self.handler.messages), 4)
+        self.assertTrue(self.handler.messages[2].startswith("Suppressed 2 more"))
+        self.assertEqual(self.handler.messages[3], "Token error: later")
+
+    def test_records_without_path_are_not_sampled(self):
+        for i in range(5):
+            self.logger.info("User '%s' logged.", i)
+        self.assertEqual(len(self.handler.messages), 5)
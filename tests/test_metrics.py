@@ -0,0 +1,122 @@
+import json
+
+from django.test import TestCase
+from ninja_jwt.tokens import AccessToken
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from src.articles.models import Article
+from src.core.auth import clear_auth_user_cache
+from src.users.models import User
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        clear_auth_user_cache()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="author", email="a@example.com", password="pass1234"
+        )
+        self.article = Article.objects.create(
+            title="Title", content="Content", author=self.user
+        )
+
+    def test_requests_are_counted_by_route(self):
+        labels = {"route": "list_articles", "method": "GET", "status": "200"}
+        before = sample("http_requests_total", **labels)
+
+        response = self.client.get("/api/v1/articles/")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(sample("http_requests_total", **labels), before + 1)
+
+    def test_route_is_resolved_per_method(self):
+        url = f"/api/v1/articles/{self.article.id}"
+        labels = {"route": "delete_article", "method": "DELETE", "status": "401"}
+        before = sample("http_requests_total", **labels)
+
+        self.client.delete(url)
+
+        self.assertEqual(sample("http_requests_total", **labels), before + 1)
+
+    def test_async_routes_record_queries(self):
+        labels = {"route": "get_article_async", "method": "GET"}
+        queries = sample("db_queries_per_request_sum", **labels)
+        count = sample("db_queries_per_request_count", **labels)
+
+        response = self.client.get(f"/api/v1/async/articles/{self.article.id}")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(sample("db_queries_per_request_count", **labels), count + 1)
+        self.assertGreater(sample("db_queries_per_request_sum", **labels), queries)
+
+    def test_streamed_queries_are_recorded_once_sent(self):
+        labels = {"route": "list_articles", "method": "GET"}
+        count = sample("db_queries_per_request_count", **labels)
+
+        response = self.client.get("/api/v1/articles/", {"stream": "true"})
+        self.assertEqual(sample("db_queries_per_request_count", **labels), count)
+        queries = sample("db_queries_per_request_sum", **labels)
+        b"".join(response.streaming_content)
+
+        self.assertEqual(sample("db_queries_per_request_count", **labels), count + 1)
+        self.assertGreater(sample("db_queries_per_request_sum", **labels), queries)
+
+    async def test_asgi_streams_are_sent_incrementally(self):
+        labels = {"route": "list_articles_async", "method": "GET"}
+        count = sample("db_queries_per_request_count", **labels)
+
+        response = await self.async_client.get(
+            "/api/v1/async/articles/", {"stream": "true"}
+        )
+        # An async iterator, so Django sends chunks as they are produced
+        # instead of buffering a sync one whole.
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(json.loads(body)[0]["title"], "Title")
+        self.assertEqual(sample("db_queries_per_request_count", **labels), count + 1)
+
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        self.client.get("/api/v1/articles/")
+
+        response = self.client.get("/api/v1/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('route="list_articles"', body)
+        self.assertIn("http_request_duration_seconds_bucket", body)
+        self.assertIn("db_query_seconds_total", body)
+
+    def test_metrics_endpoint_is_internal_only(self):
+        url = "/api/v1/metrics"
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="10.1.2.3").status_code, 200)
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR="203.0.113.7").status_code, 403
+        )
+        # Relayed by the public proxy, even though nginx itself is internal.
+        response = self.client.get(
+            url, REMOTE_ADDR="172.18.0.5", HTTP_X_FORWARDED_FOR="203.0.113.7"
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_database_stats_are_staff_only(self):
+        url = "/api/v1/internal/db"
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.assertEqual(self.client.get(url, **headers).status_code, 403)
+
+        staff = User.objects.create_user(username="staff", is_staff=True)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(staff)}"}
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()
+        self.assertEqual(stats["alias"], "default")
+        self.assertTrue(stats["health_checks"])
+        self.assertIn("conn_max_age", stats)
+        self.assertIsNone(stats["pool"])
@@ -0,0 +1,172 @@
+from django.test import TestCase, override_settings
+from django.urls import URLResolver, get_resolver, resolve
+from ninja_jwt.tokens import AccessToken, RefreshToken
+from rest_framework.test import APIClient
+
+from src.articles.models import Article
+from src.comments.models import Comment
+from src.core.auth import clear_auth_user_cache
+from src.core.metrics import QueryBudgetExceeded
+from src.users.models import User
+
+
+def operations(patterns=None):
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            yield from operations(pattern.url_patterns)
+            continue
+        path_view = getattr(pattern.callback, "__self__", None)
+        yield from getattr(path_view, "operations", ())
+
+
+@override_settings(QUERY_BUDGET_MODE="raise")
+class QueryBudgetTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="author", password="pass1234", is_staff=True
+        )
+        self.other_user = User.objects.create_user(
+            username="other", password="pass1234"
+        )
+        # Several rows by different authors, so per-row lazy loads show up.
+        self.article = Article.objects.create(
+            title="Title", content="Content", author=self.user
+        )
+        for author in (self.user, self.other_user):
+            Article.objects.create(title="More", content="More", author=author)
+            for _ in range(3):
+                Comment.objects.create(
+                    article=self.article, author=author, content="Comment"
+                )
+        self.comment = Comment.objects.create(
+            article=self.article, author=self.user, content="Mine"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+    def request(self, method, path, data=None, token=None, status=200):
+        # Budgets hold with a cold authentication cache.
+        clear_auth_user_cache()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        response = getattr(self.client, method)(path, data, format="json", **headers)
+        self.assertEqual(response.status_code, status, path)
+        return response
+
+    def test_every_route_declares_a_budget(self):
+        missing = [
+            operation.view_func.__name__
+            for operation in operations()
+            if getattr(operation.view_func, "query_budget", None) is None
+        ]
+        self.assertEqual(missing, [])
+
+    def test_read_routes(self):
+        for prefix in ("", "async/"):
+            for token in (None, self.token):
+                for path in (
+                    "articles/",
+                    "articles/?view=summary",
+                    "articles/?fields=id,title",
+                    f"articles/{self.article.id}",
+                    f"articles/{self.article.id}?fields=id,title",
+                    f"articles/{self.article.id}/comments",
+                    "comments/",
+                    f"comments/?article_id={self.article.id}",
+                    f"comments/{self.comment.id}",
+                    f"comments/{self.comment.id}?fields=id",
+                    f"users/{self.other_user.id}",
+                    f"users/{self.other_user.id}?fields=id",
+                ):
+                    self.request("get", f"/api/v1/{prefix}{path}", token=token)
+            self.request("get", f"/api/v1/{prefix}users/", token=self.token)
+        self.request("get", "/api/v1/articles/search?q=title")
+        self.request("get", "/api/v1/metrics")
+        self.request("get", "/api/v1/internal/db", token=self.token)
+
+    def test_write_routes(self):
+        for prefix in ("", "async/"):
+            api = f"/api/v1/{prefix}"
+            article = self.request(
+                "post",
+                f"{api}articles/",
+                {"title": "New", "content": "Body"},
+                self.token,
+            ).json()
+            self.request(
+                "put",
+                f"{api}articles/{article['id']}",
+                {"title": "Changed"},
+                self.token,
+            )
+            comment = self.request(
+                "post",
+                f"{api}comments/",
+                {"article_id": article["id"], "content": "Hi"},
+                self.token,
+            ).json()
+            self.request(
+                "put", f"{api}comments/{comment['id']}", {"content": "Bye"}, self.token
+            )
+            self.request("delete", f"{api}comments/{comment['id']}", token=self.token)
+            self.request("delete", f"{api}articles/{article['id']}", token=self.token)
+            self.request(
+                "put", f"{api}users/{self.user.id}", {"bio": "Bio"}, self.token
+            )
+
+            doomed = User.objects.create_user(username=f"doomed{prefix}")
+            Article.objects.create(title="Gone", content="Gone", author=doomed)
+            self.request(
+                "delete",
+                f"{api}users/{doomed.id}",
+                token=str(AccessToken.for_user(doomed)),
+            )
+
+        self.request(
+            "post",
+            "/api/v1/articles/bulk",
+            [{"title": f"Bulk {i}", "content": "Body"} for i in range(5)],
+            self.token,
+        )
+        self.request(
+            "post",
+            "/api/v1/comments/bulk",
+            [{"article_id": self.article.id, "content": "Bulk"} for _ in range(5)],
+            self.token,
+        )
+
+    def test_auth_routes(self):
+        credentials = {"username": "author", "password": "pass1234"}
+        self.request("post", "/api/v1/auth/login", credentials)
+        self.request(
+            "post",
+            "/api/v1/auth/register",
+            {"username": "newcomer", "password": "pass1234"},
+            status=201,
+        )
+        refresh = str(RefreshToken.for_user(self.user))
+        self.request("post", "/api/v1/auth/refresh", {"refresh": refresh})
+        self.request("post", "/api/v1/auth/logout", token=self.token)
+
+    def test_exceeding_budget_raises(self):
+        operation = self.operation("/api/v1/articles/", "GET")
+        self.set_budget(operation, 0)
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/api/v1/articles/")
+
+    @override_settings(QUERY_BUDGET_MODE="warn")
+    def test_exceeding_budget_warns(self):
+        operation = self.operation("/api/v1/articles/", "GET")
+        self.set_budget(operation, 0)
+        with self.assertLogs("src.core.metrics", "WARNING") as logs:
+            response = self.client.get("/api/v1/articles/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Query budget exceeded on list_articles", logs.output[0])
+
+    def operation(self, path, method):
+        path_view = resolve(path).func.__self__
+        return next(op for op in path_view.operations if method in op.methods)
+
+    def set_budget(self, operation, budget):
+        previous = operation.view_func.query_budget
+        operation.view_func.query_budget = budget
+        self.addCleanup(setattr, operation.view_func, "query_budget", previous)